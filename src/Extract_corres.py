@@ -1,3 +1,5 @@
+import numpy as np
+import shapely
 import geopandas as gpd
 from shapely.geometry import Polygon, MultiPolygon
 import os
@@ -15,6 +17,71 @@ def calculate_iou(poly1, poly2):
     union = poly1.union(poly2).area
     return intersection / union if union > 0 else 0
 
+MATCH_MODES = ("greedy", "one_to_one")
+IOU_TOLERANCE = 1e-9  # 임계값과 이 차이 이내인 쌍은 calculate_iou로 다시 계산 (면적 공식과 union 연산의 부동소수점 차이 보정)
+
+def iou_candidate_pairs(ref_geoms, sam_geoms):
+    """
+    BBox가 겹치는 (수치지도, 추론) 쌍과 IoU를 한 번에 계산 (수치지도 순서, 그 안에서 추론 순서)
+    IoU = 교차 면적 / (면적1 + 면적2 - 교차 면적)
+    """
+    ref_index, sam_index = shapely.STRtree(sam_geoms).query(ref_geoms)
+    order = np.lexsort((sam_index, ref_index))
+    ref_index, sam_index = ref_index[order], sam_index[order]
+
+    intersection = shapely.area(shapely.intersection(ref_geoms[ref_index], sam_geoms[sam_index]))
+    union = shapely.area(ref_geoms)[ref_index] + shapely.area(sam_geoms)[sam_index] - intersection
+    iou = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+    return ref_index, sam_index, iou
+
+def match_high_iou(ref_geoms, sam_geoms, iou_threshold=0.5, mode="greedy"):
+    """
+    IoU가 iou_threshold 이상인 (수치지도 위치, 추론 위치) 쌍을 수치지도 순서로 반환
+    - greedy     : 수치지도 폴리곤마다 첫 번째로 기준을 넘는 추론 폴리곤 (기존 이중 for문과 같은 결과, 같은 추론 폴리곤이 여러 번 매칭될 수 있음)
+    - one_to_one : IoU가 높은 쌍부터 배정하여 추론 폴리곤도 한 번만 매칭
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown matching mode: {mode} (choose from {MATCH_MODES})")
+    ref_geoms, sam_geoms = np.asarray(ref_geoms), np.asarray(sam_geoms)
+    if len(ref_geoms) == 0 or len(sam_geoms) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    if iou_threshold <= 0 and mode == "greedy":
+        # 기존 방식에서는 IoU 0도 기준을 넘으므로 항상 첫 번째 추론 폴리곤
+        return np.arange(len(ref_geoms)), np.zeros(len(ref_geoms), dtype=np.intp)
+
+    ref_index, sam_index, iou = iou_candidate_pairs(ref_geoms, sam_geoms)
+    passed = iou >= iou_threshold
+    near = np.flatnonzero(np.abs(iou - iou_threshold) <= IOU_TOLERANCE)
+    for k in near:
+        passed[k] = calculate_iou(ref_geoms[ref_index[k]], sam_geoms[sam_index[k]]) >= iou_threshold
+    ref_index, sam_index, iou = ref_index[passed], sam_index[passed], iou[passed]
+
+    if mode == "greedy":
+        _, first = np.unique(ref_index, return_index=True)  # 수치지도 폴리곤별 첫 번째 쌍
+        return ref_index[first], sam_index[first]
+
+    # IoU 내림차순 (같으면 수치지도, 추론 순서)으로 양쪽 모두 비어 있을 때만 배정
+    used_ref, used_sam, matched = set(), set(), []
+    for k in np.lexsort((sam_index, ref_index, -iou)):
+        if ref_index[k] not in used_ref and sam_index[k] not in used_sam:
+            used_ref.add(ref_index[k])
+            used_sam.add(sam_index[k])
+            matched.append(k)
+    matched = np.sort(np.asarray(matched, dtype=np.intp))  # 쌍의 순서 = 수치지도 순서
+    return ref_index[matched], sam_index[matched]
+
+# 기존 방식 (수치지도 × 추론 전체 쌍에 calculate_iou, 비교/검증용)
+def match_high_iou_bruteforce(ref_geoms, sam_geoms, iou_threshold=0.5):
+    ref_matched, sam_matched = [], []
+    for i, ref_poly in enumerate(ref_geoms):
+        for j, sam_poly in enumerate(sam_geoms):
+            iou = calculate_iou(ref_poly, sam_poly)
+            if iou >= iou_threshold:
+                ref_matched.append(i)
+                sam_matched.append(j)
+                break  # 하나만 매칭되면 멈춤
+    return np.asarray(ref_matched, dtype=np.intp), np.asarray(sam_matched, dtype=np.intp)
+
 def separate_polygons(geo_df):
     """
     GeoDataFrame 내 MultiPolygon을 개별 Polygon으로 분리
@@ -27,7 +94,10 @@ def separate_polygons(geo_df):
             polygons.append(geom)  # 이미 Polygon이면 그대로 추가
     return gpd.GeoDataFrame(geometry=polygons, crs=geo_df.crs)
 
-def extract_high_iou_polygons(merged_samPoly_path, reference_map_path, iou_threshold=0.5):
+def extract_high_iou_polygons(merged_samPoly_path, reference_map_path, iou_threshold=0.5, mode="greedy"):
+    """
+    mode: "greedy"(기존과 동일, 수치지도 폴리곤마다 첫 번째 매칭) / "one_to_one"(추론 폴리곤도 한 번만 매칭)
+    """
     if not os.path.exists(merged_samPoly_path) or not os.path.exists(reference_map_path):
         print("❌ 오류: 하나 이상의 Shapefile이 존재하지 않습니다.")
         return
@@ -50,14 +120,9 @@ def extract_high_iou_polygons(merged_samPoly_path, reference_map_path, iou_thres
     print(f"총 추론 폴리곤 개수: {len(merged_samPoly)}")
     print(f"총 분리된 수치지도 폴리곤 개수: {len(reference_map)}")
 
-    # IoU 기준 이상 겹치는 폴리곤 필터링
-    matched_polygons = []
-    for ref_poly in reference_map.geometry:
-        for sam_poly in merged_samPoly.geometry:
-            iou = calculate_iou(ref_poly, sam_poly)
-            if iou >= iou_threshold:
-                matched_polygons.append(sam_poly)
-                break  # 하나만 매칭되면 멈춤
+    # IoU 기준 이상 겹치는 폴리곤 필터링 (BBox가 겹치는 쌍만 계산)
+    _, sam_index = match_high_iou(reference_map.geometry.values, merged_samPoly.geometry.values, iou_threshold, mode)
+    matched_polygons = list(merged_samPoly.geometry.values[sam_index])
 
     # 매칭된 폴리곤 개수 출력
     print(f"✅ 매칭된 폴리곤 개수: {len(matched_polygons)}")
@@ -71,4 +136,5 @@ def extract_high_iou_polygons(merged_samPoly_path, reference_map_path, iou_thres
     matched_gdf.to_file(output_file, driver='ESRI Shapefile', encoding='utf-8')
 
 # 사용 예시
-extract_high_iou_polygons(mergedSAM_path, mergedDigital_path, iou_threshold=0.8 )
+if __name__ == "__main__":
+    extract_high_iou_polygons(mergedSAM_path, mergedDigital_path, iou_threshold=0.8 )
@@ -1,14 +1,21 @@
 import os
 import numpy as np
-import rasterio
+import torch
 from ultralytics.models.fastsam import FastSAMPredictor
-import rasterio
-from rasterio.transform import rowcol
-import matplotlib.pyplot as plt
-from sklearn.metrics.pairwise import euclidean_distances
+from ultralytics.utils.ops import scale_masks
+from geo_transform import real_to_image_coordinates
+from scipy.spatial import cKDTree
+import instrumentation
+from onnx_predictor import OnnxFastSAMPredictor, export_onnx
+
+# 모델 이름 대신 쓸 수 있는 약칭 (FastSAM-s: 더 작고 빠른 모델)
+MODEL_VARIANTS = {"x": "FastSAM-x.pt", "s": "FastSAM-s.pt"}
 
 # ✅ 1. FastSAM 모델 불러오기
-def create_fastsam_predictor(model_filename="FastSAM-x.pt", conf=0.2, iou=0.8):
+# backend: "torch"(ultralytics PyTorch) / "onnx"(ONNX Runtime CPU, 처음 한 번 가중치 옆에 .onnx로 내보내 캐시)
+# intra_op_threads / inter_op_threads: ONNX Runtime 세션 스레드 수 (onnx 백엔드에서만 사용)
+def create_fastsam_predictor(model_filename="FastSAM-x.pt", conf=0.2, iou=0.8, backend="torch", intra_op_threads=None, inter_op_threads=1):
+    model_filename = MODEL_VARIANTS.get(model_filename, model_filename)
     model_path = os.path.join(os.path.dirname(__file__), model_filename)
     overrides = {
         "conf": conf,
@@ -18,78 +25,165 @@ def create_fastsam_predictor(model_filename="FastSAM-x.pt", conf=0.2, iou=0.8):
         "model": model_path,
         "save": False
     }
+    if backend == "onnx":
+        return OnnxFastSAMPredictor(export_onnx(model_path), overrides, intra_op_threads, inter_op_threads)
+    if backend != "torch":
+        raise ValueError(f"지원하지 않는 backend입니다: {backend} (torch / onnx)")
     return FastSAMPredictor(overrides=overrides)
 
-# ✅ 3. EPSG좌표 이미지 좌표로 변환함수
-def real_to_image_coordinates(image_path, real_coordinates):
-    with rasterio.open(image_path) as dataset:
-        transform = dataset.transform  # TIFF 변환 정보
-
-    # 실제 좌표를 이미지의 픽셀 좌표로 변환
-    point_coords = np.array([rowcol(transform, point.x, point.y) for point in real_coordinates])
-    point_coords = np.flip(point_coords, axis=1)  # row, col → col, row 변환
-
-    # 이미지 범위 내에서 좌표를 클리핑
-    point_coords = np.clip(point_coords, (0, 0), (dataset.width - 1, dataset.height - 1))
-
-    return point_coords
-
 def combine_masks(mask_list):
     # Ensure there is at least one mask
     if len(mask_list) == 0:
         return None
 
     # Initialize a mask with zeros of the same shape as the first mask in the list
-    combined_mask = np.zeros_like(mask_list[0])
+    combined_mask = np.zeros(mask_list[0].shape, dtype=np.uint8)
 
-    # Apply logical OR to combine all masks
+    # Apply logical OR to combine all masks (in place)
     for mask in mask_list:
-        combined_mask = np.logical_or(combined_mask, mask).astype(np.uint8)
+        np.logical_or(combined_mask, mask, out=combined_mask)
 
     return combined_mask
 
-# ✅ 4. FastSAM을 사용하여 마스크 생성
-def generate_fastsam_mask(image_path, positive_coords, negative_coords, samPredictor):
-    # EPSG 좌표를 이미지의 픽셀 좌표로 변환
-    pos_point_coords = real_to_image_coordinates(image_path, positive_coords)
-    neg_point_coords = []
-    if negative_coords:
-        neg_point_coords = real_to_image_coordinates(image_path, negative_coords)
-
-    predictor = samPredictor
-    everything_results = predictor(image_path)
-
-    print("🚀 Everything Results:", everything_results)
-
-    mask_list = []
-
-    for pos in pos_point_coords:
-         # Calculate distances between the current positive point and all other positive points
-        distances = euclidean_distances([pos], pos_point_coords)[0]
-        
-        # Get the indices of the 5 nearest points (excluding the point itself)
-        nearest_indices = np.argsort(distances)[1:3]
-        
-        # Get the coordinates of the 5 nearest points
-        nearest_pos_points = [pos_point_coords[i] for i in nearest_indices]
-
-        # Prepare the input for the prompt (positive points from nearest_pos_points and negative points if available)
-        input_points = np.array(nearest_pos_points + (list(neg_point_coords) if neg_point_coords is not None else []))
-        input_labels = np.array([1] * len(nearest_pos_points) + [0] * len(neg_point_coords))
+# 각 positive 포인트에 대해 가장 가까운 positive 포인트 인덱스 (자기 자신 제외)
+# KD-tree를 한 번 만들어 모든 포인트를 한꺼번에 질의, 이웃이 부족한 자리는 len(pos_point_coords)로 채워짐
+def nearest_positive_indices(pos_point_coords, n_neighbours=2):
+    tree = cKDTree(pos_point_coords)
+    _, indices = tree.query(pos_point_coords, k=list(range(2, n_neighbours + 2)))
+    return indices
+
+# everything 마스크에서 각 포인트를 포함하는 마스크 여부 (M, P)
+def mask_membership(masks, coords, orig_shape):
+    coords = np.asarray(coords, dtype=np.int32).reshape(-1, 2)
+    height, width = orig_shape
+    xs = torch.as_tensor(np.clip(coords[:, 0], 0, width - 1), dtype=torch.long, device=masks.device)
+    ys = torch.as_tensor(np.clip(coords[:, 1], 0, height - 1), dtype=torch.long, device=masks.device)
+    return masks[:, ys, xs].bool().cpu().numpy()
+
+def everything_mask_count(everything_result):
+    return 0 if everything_result.masks is None else len(everything_result.masks)
+
+# everything 결과의 마스크를 원본 영상 크기(letterbox 여백 제거)로 맞춘 (M, H, W) 스택
+def everything_mask_stack(everything_result):
+    if len(everything_result) == 0 or everything_result.masks is None:
+        return None
+    return scale_to_orig(everything_result.masks.data, everything_result.orig_shape)
+
+# letterbox 크기의 마스크 (M, h, w)를 원본 영상 크기로 (predictor.prompt와 같은 방식)
+def scale_to_orig(masks, orig_shape):
+    if masks.shape[1:] != orig_shape:
+        masks = (scale_masks(masks[None].float(), orig_shape)[0] > 0.5).byte()
+    return masks
+
+def resolve_prompt_masks(masks, pos_point_coords, neighbours, neg_point_coords):
+    """
+    everything 마스크 스택(everything_mask_stack)을 한 번만 읽어 모든 프롬프트의 마스크를 한꺼번에 선택
+    predictor.prompt와 같은 규칙으로, 인접 positive 포인트를 포함하고 negative 포인트를 포함하지 않는
+    첫 번째 마스크를 고름. 인접 positive가 없으면(positive가 하나뿐인 타일) predictor.prompt의 negative만 있는
+    경우와 같이 negative를 포함하지 않는 첫 번째 마스크. 반환값은 프롬프트별 마스크 인덱스 (-1은 마스크 없음)
+    """
+    n_prompts = len(neighbours)
+    if masks is None:
+        return np.full(n_prompts, -1)
+
+    # 모든 포인트의 마스크 포함 여부를 한 번에 수집
+    pos_hits = mask_membership(masks, pos_point_coords, masks.shape[1:])
+    neg_hits = mask_membership(masks, neg_point_coords, masks.shape[1:]).any(axis=1)
+
+    # 빈 이웃 자리(인덱스 len(pos_point_coords))는 항상 False인 열을 가리킴
+    lengths = (neighbours < pos_hits.shape[1]).sum(axis=1)
+    pos_hits = np.concatenate([pos_hits, np.zeros((len(pos_hits), 1), dtype=bool)], axis=1)
+
+    # positive를 포함한 마스크를 선택하고 (positive가 없으면 전체 선택) negative를 포함한 마스크는 제외
+    selected = pos_hits[:, neighbours].any(axis=2) | (lengths == 0)[None, :]
+    selected &= ~neg_hits[:, None]
+
+    return np.where(selected.any(axis=0), selected.argmax(axis=0), -1)
+
+def union_selected_masks(mask_data, mask_indices, stats=None):
+    """
+    프롬프트별로 선택된 everything 마스크를 합침
+    같은 마스크를 고른 프롬프트는 한 번만 합치고(중복 제거), 결과 버퍼에 제자리(in-place)로 OR 연산
+    프롬프트/마스크 개수와 중복 제거된 프롬프트 수는 stats(dict)와 instrumentation 기록에 남김
+    """
+    mask_indices = np.asarray(mask_indices)
+    resolved = mask_indices[mask_indices >= 0]
+    unique_indices = np.unique(resolved)
+
+    counts = {
+        "prompts": len(mask_indices),
+        "no_mask": int((mask_indices < 0).sum()),
+        "unique_masks": len(unique_indices),
+        "deduplicated": len(resolved) - len(unique_indices),
+    }
+    if stats is not None:
+        stats.update(counts)
+    instrumentation.count(**counts)
 
-        mask_results = predictor.prompt(everything_results, points=input_points.tolist(), labels=input_labels.tolist())
+    if len(unique_indices) == 0:
+        return None
 
-        # 마스크가 존재하는지 확인 후 처리
-        if mask_results and hasattr(mask_results[0], "masks") and mask_results[0].masks:
-            mask_array = mask_results[0].masks.data.cpu().numpy()
+    combined_mask = np.zeros(mask_data.shape[1:], dtype=np.uint8)
+    for mask_index in unique_indices:
+        np.logical_or(combined_mask, mask_data[mask_index].cpu().numpy(), out=combined_mask)
 
-            # 차원 확인 후 변환
-            if mask_array.ndim == 3:
-                mask_array = mask_array[0]  # 첫 번째 마스크 선택
-            
-            mask_list.append(mask_array)
-        else:
-            print("No mask detected")
+    return combined_mask
 
-    return combine_masks(mask_list)
+# 타일 하나의 everything 결과에서 프롬프트 마스크를 골라 합침 (단일 / 여러 타일 추론 공통)
+# 원본 영상 크기로 맞춘 마스크 스택에서 고르고 합치므로 결과가 letterbox 크기(배치 구성)와 무관
+def select_tile_mask(everything_result, pos_point_coords, neighbours, neg_point_coords, stats=None):
+    n_masks = everything_mask_count(everything_result)
+    instrumentation.count(everything_masks=n_masks)
+    if stats is not None:
+        stats["everything_masks"] = n_masks
+    mask_stack = everything_mask_stack(everything_result)
+    mask_indices = resolve_prompt_masks(mask_stack, pos_point_coords, neighbours, neg_point_coords)
+    return union_selected_masks(mask_stack, mask_indices, stats)
+
+# EPSG 좌표의 프롬프트를 이미지의 픽셀 좌표로 변환
+def prompt_pixel_coords(tile, positive_coords, negative_coords):
+    pos_point_coords = real_to_image_coordinates(tile, positive_coords)
+    neg_point_coords = []
+    if negative_coords:
+        neg_point_coords = real_to_image_coordinates(tile, negative_coords)
+    return pos_point_coords, neg_point_coords
 
+# ✅ 4. FastSAM을 사용하여 마스크 생성
+# 모든 프롬프트의 마스크를 한 번에 선택하고(resolve_prompt_masks), 서로 다른 마스크만 한 번씩 합침
+# 마스크는 원본 영상 크기, stats(dict)가 주어지면 everything 마스크 / 프롬프트 개수 기록
+def generate_fastsam_mask(tile, positive_coords, negative_coords, samPredictor, n_neighbours=2, stats=None):
+    # EPSG 좌표를 이미지의 픽셀 좌표로 변환
+    pos_point_coords, neg_point_coords = prompt_pixel_coords(tile, positive_coords, negative_coords)
+
+    # 파일 경로 대신 이미 읽어둔 영상 배열을 전달 (BGR)
+    with instrumentation.stage("everything_inference"):
+        everything_results = samPredictor(tile.image)
+
+    neighbours = nearest_positive_indices(pos_point_coords, n_neighbours)
+    with instrumentation.stage("prompt_resolution"):
+        return select_tile_mask(everything_results[0], pos_point_coords, neighbours, neg_point_coords, stats)
+
+def generate_fastsam_masks_batch(tiles, prompts, samPredictor, batch_size=8, n_neighbours=2, stats=None):
+    """
+    여러 타일을 batch_size개씩 묶어 everything 추론을 한 번에 실행하고 타일별 마스크 생성
+    prompts: 타일별 (positive_coords, negative_coords)
+    마스크는 generate_fastsam_mask와 같이 select_tile_mask로 고르므로 batch_size와 관계없이 같은 결과 (각 타일의 원본 크기)
+    stats(list)가 주어지면 타일별 개수 기록
+    """
+    masks = []
+    for start in range(0, len(tiles), batch_size):
+        batch_tiles = tiles[start:start + batch_size]
+        with instrumentation.stage("everything_inference"):
+            everything_results = samPredictor([tile.image for tile in batch_tiles])
+
+        for tile, (positive_coords, negative_coords), everything_result in zip(batch_tiles, prompts[start:start + batch_size], everything_results):
+            pos_point_coords, neg_point_coords = prompt_pixel_coords(tile, positive_coords, negative_coords)
+            neighbours = nearest_positive_indices(pos_point_coords, n_neighbours)
+
+            with instrumentation.stage("prompt_resolution"):
+                tile_stats = {}
+                masks.append(select_tile_mask(everything_result, pos_point_coords, neighbours, neg_point_coords, tile_stats))
+            if stats is not None:
+                stats.append(tile_stats)
+
+    return masks
@@ -0,0 +1,76 @@
+"""
+정제 파이프라인의 시각화(진단 그림) 출력 방식을 관리
+- "off"         : 그림을 전혀 만들지 않음 (matplotlib도 import하지 않음)
+- "file"        : 백그라운드 스레드에서 PNG 파일로 저장 (실행을 막지 않음)
+- "interactive" : 기존과 같이 plt.show()로 화면에 표시
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = ("off", "file", "interactive")
+
+_mode = "interactive"
+_output_dir = None
+_executor = None
+
+def configure(mode="interactive", output_dir=None):
+    global _mode, _output_dir
+    if mode not in MODES:
+        raise ValueError(f"Unknown diagnostics mode: {mode} (choose from {MODES})")
+    if mode == "file":
+        if output_dir is None:
+            raise ValueError("output_dir is required for file diagnostics")
+        os.makedirs(output_dir, exist_ok=True)
+    close()
+    _mode, _output_dir = mode, output_dir
+
+def enabled():
+    return _mode != "off"
+
+# 타일 경로에서 그림 파일 이름에 쓸 태그 생성
+def tile_tag(tile):
+    if tile is None or tile.path is None:
+        return "tile"
+    return os.path.splitext(os.path.basename(str(tile.path)))[0]
+
+def _render_to_file(path, draw, args, figsize):
+    # pyplot 상태를 건드리지 않도록 Figure를 직접 생성 (스레드에서 안전)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig.subplots(), *args)
+    fig.savefig(path)
+
+def emit(tag, name, draw, *args, figsize=(8, 6)):
+    """
+    draw(ax, *args)로 그림을 그려 현재 모드에 맞게 출력
+    """
+    global _executor
+    if _mode == "off":
+        return
+    if _mode == "interactive":
+        import matplotlib.pyplot as plt
+
+        _, ax = plt.subplots(figsize=figsize)
+        draw(ax, *args)
+        plt.show()
+        return
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diagnostics")
+    path = os.path.join(_output_dir, f"{tag}_{name}.png")
+    _executor.submit(_render_to_file, path, draw, args, figsize).add_done_callback(_report_error)
+
+def _report_error(future):
+    if future.exception() is not None:
+        print(f"⚠️ 진단 그림 저장 실패: {future.exception()}")
+
+# 남은 그림 저장이 끝날 때까지 대기
+def close():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,36 @@
+import numpy as np
+import shapely
+from rasterio.transform import rowcol, xy
+
+# 좌표 목록(shapely Point 또는 (x, y) 튜플)을 x, y 배열로 변환
+def coords_to_xy(real_coordinates):
+    if len(real_coordinates) == 0:
+        return np.empty(0), np.empty(0)
+    if isinstance(real_coordinates[0], shapely.Geometry):
+        coords = shapely.get_coordinates(np.asarray(real_coordinates, dtype=object))
+    else:
+        coords = np.asarray(real_coordinates, dtype=float).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1]
+
+# 실제 좌표 배열 → 픽셀 (row, col) 배열 (역변환 후 내림, 클리핑 없음)
+def world_to_rowcol(transform, xs, ys):
+    if len(xs) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    rows, cols = rowcol(transform, xs, ys)
+    return np.asarray(rows), np.asarray(cols)
+
+# 픽셀 (row, col) 배열 → 픽셀 중심의 실제 좌표 배열
+def pixel_to_world(transform, rows, cols):
+    if len(rows) == 0:
+        return np.empty(0), np.empty(0)
+    xs, ys = xy(transform, rows, cols)
+    return np.asarray(xs), np.asarray(ys)
+
+# ✅ EPSG좌표 이미지 좌표로 변환함수 (결과는 (col, row) 순서, 영상 범위 내로 클리핑)
+def real_to_image_coordinates(tile, real_coordinates):
+    xs, ys = coords_to_xy(real_coordinates)
+    rows, cols = world_to_rowcol(tile.transform, xs, ys)
+    point_coords = np.column_stack([cols, rows])
+
+    # 이미지 범위 내에서 좌표를 클리핑
+    return np.clip(point_coords, (0, 0), (tile.width - 1, tile.height - 1))
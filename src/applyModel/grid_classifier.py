@@ -0,0 +1,91 @@
+import math
+import numpy as np
+import shapely
+from rasterio.transform import from_origin
+from rasterio.features import rasterize
+from scipy.ndimage import distance_transform_edt
+
+# 프롬프트 격자 좌표 생성 (기존 create_points와 동일한 순서: x 바깥 루프, y 안쪽 루프, bench_prompt_grid 참고)
+def create_grid(bounds, space=1.5):
+    x_coords = np.arange(bounds.left, bounds.right, space)
+    y_coords = np.arange(bounds.bottom, bounds.top, space)
+    return x_coords, y_coords
+
+def grid_to_xy(x_coords, y_coords):
+    xs, ys = np.meshgrid(x_coords, y_coords, indexing="ij")
+    return xs.ravel(), ys.ravel()
+
+# 폴리곤의 경계를 래스터화하기 위한 기하 목록
+def _boundary_shapes(geometry):
+    shapes = []
+    for part in shapely.get_parts(geometry):
+        if shapely.get_type_id(part) in (3, 6):  # Polygon, MultiPolygon
+            shapes.append(shapely.boundary(part))
+        else:
+            shapes.append(part)  # 선/점 조각은 그 자체가 경계
+    return [shape for shape in shapes if not shape.is_empty]
+
+# 격자점이 정확히 픽셀 중심에 오도록 작업용 래스터 정의
+def _working_raster(x_coords, y_coords, space, max_distance, resolution):
+    oversample = max(1, math.ceil(space / resolution))
+    cell = space / oversample
+    tol = cell * math.sqrt(2)  # 래스터 거리 오차 한계(반 대각선)의 2배
+    pad = math.ceil((max_distance + 2 * tol) / cell)
+
+    width = 2 * pad + (len(x_coords) - 1) * oversample + 1
+    height = 2 * pad + (len(y_coords) - 1) * oversample + 1
+    left = x_coords[0] - (pad + 0.5) * cell
+    top = y_coords[0] + (height - 1 - pad + 0.5) * cell
+    transform = from_origin(left, top, cell, cell)
+
+    cols = pad + np.arange(len(x_coords)) * oversample
+    rows = height - 1 - pad - np.arange(len(y_coords)) * oversample
+    cols, rows = np.meshgrid(cols, rows, indexing="ij")
+    return transform, (height, width), cell, tol, rows.ravel(), cols.ravel()
+
+def classify_grid(x_coords, y_coords, combined_polygon, min_distance, max_distance, space, resolution=0.5):
+    """
+    격자점을 positive(폴리곤 내부)와 negative(min_distance 이상 max_distance 미만 거리)로 분류
+    폴리곤을 한 번 래스터화하고 거리 변환으로 분류하며, 경계 부근의 애매한 점만 shapely로 정확히 계산
+    반환값은 grid_to_xy 순서의 boolean 배열 (positive_mask, negative_mask)
+    """
+    n_points = len(x_coords) * len(y_coords)
+    positive_mask = np.zeros(n_points, dtype=bool)
+    negative_mask = np.zeros(n_points, dtype=bool)
+    if n_points == 0 or combined_polygon is None or combined_polygon.is_empty:
+        return positive_mask, negative_mask
+
+    transform, shape, cell, tol, rows, cols = _working_raster(x_coords, y_coords, space, max_distance, resolution)
+
+    # 1. 픽셀 중심 기준 내부 여부 (격자점이 픽셀 중심이므로 점 자체의 포함 여부)
+    inside = rasterize([combined_polygon], out_shape=shape, transform=transform, fill=0, default_value=1, dtype="uint8").astype(bool)
+
+    # 2. 경계가 지나가는 모든 픽셀과 그 픽셀까지의 거리
+    boundary = rasterize(_boundary_shapes(combined_polygon), out_shape=shape, transform=transform, fill=0, default_value=1, all_touched=True, dtype="uint8").astype(bool)
+    if boundary.any():
+        boundary_distance = distance_transform_edt(~boundary, sampling=cell)
+    else:
+        boundary_distance = np.full(shape, np.inf)
+
+    point_inside = inside[rows, cols]
+    distance = boundary_distance[rows, cols]
+
+    # 3. 래스터만으로 확정 가능한 점 분류
+    near_boundary = distance <= tol
+    outside = ~point_inside & ~near_boundary
+    positive_mask[point_inside & ~near_boundary] = True
+    negative_mask[outside & (distance - tol >= min_distance) & (distance + tol < max_distance)] = True
+    decided_out = (distance + tol < min_distance) | (distance - tol >= max_distance)
+    ambiguous = near_boundary | (outside & ~negative_mask & ~decided_out)
+
+    # 4. 애매한 점은 기존과 동일한 within / distance 기준으로 정확히 계산
+    if ambiguous.any():
+        xs, ys = grid_to_xy(x_coords, y_coords)
+        shapely.prepare(combined_polygon)
+        amb_x, amb_y = xs[ambiguous], ys[ambiguous]
+        within = shapely.contains_xy(combined_polygon, amb_x, amb_y)
+        exact_distance = shapely.distance(combined_polygon, shapely.points(amb_x, amb_y))
+        positive_mask[ambiguous] = within
+        negative_mask[ambiguous] = ~within & (exact_distance >= min_distance) & (exact_distance < max_distance)
+
+    return positive_mask, negative_mask
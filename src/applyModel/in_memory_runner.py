@@ -0,0 +1,128 @@
+"""
+중간 Shapefile / crop TIFF 없이 지역 전체 입력에서 바로 정제 폴리곤을 만드는 실행기
+- 후보 탐색 (메인 스레드)   : 추론 폴리곤 × 수치지도, extract_underSeg_and_digital_Poly와 같은 후보와 번호
+- 타일 준비 (스레드 풀)     : 정사영상 윈도우 읽기 → TileContext → 프롬프트 생성
+- 추론 (메인 스레드, 단일)  : FastSAM, batch_size개 타일씩 묶어 추론
+- 저장 (단일 writer)        : 모든 타일의 폴리곤을 tile_id 컬럼과 함께 하나의 파일(PolygonStore)에 기록
+crop_orthophoto_unionDigit → process_main 순서로 파일을 거쳐 실행한 결과와 같은 폴리곤을 만듦
+"""
+
+import os
+import sys
+import pandas as pd
+import geopandas as gpd
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from rasterio.windows import from_bounds
+
+# preprocess 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "preprocess"))
+from extract_underSeg_and_digital_Poly import load_inputs, find_underseg_candidates
+from crop_orthophoto_unionDigit import OrthophotoReader, read_window, union_crop_bounds
+from tile_context import tile_from_array
+from prompt_generator import createPoints
+from mask_to_vector import mask_to_tile_polygons
+from polygon_store import PolygonStore
+from apply_sam import create_fastsam_predictor, generate_fastsam_mask, generate_fastsam_masks_batch
+import diagnostics
+
+# 후보 하나의 타일 준비 (crop TIFF 대신 정사영상 윈도우를 바로 읽음, 정사영상과 겹치지 않으면 None)
+def prepare_candidate_tile(reader, candidate_id, underSeg_gdf, digital_gdf, margin_ratio=0.6, budget=None):
+    src = reader.dataset()
+
+    # crop_orthophoto_unionDigit와 같은 범위 (합집합 BBox + 여유 공간)
+    polygons = gpd.GeoDataFrame(pd.concat([underSeg_gdf, digital_gdf], ignore_index=True))
+    window = from_bounds(*union_crop_bounds(polygons, margin_ratio), src.transform)
+    bands = read_window(src, window)
+    if bands.shape[1] == 0 or bands.shape[2] == 0:
+        return None  # 정사영상 범위 밖의 후보
+    tile = tile_from_array(bands, src.window_transform(window), src.crs, f"underSegOrtho{candidate_id}")
+
+    positive_points, negative_points = createPoints(tile=tile, polygon_gdf=underSeg_gdf, digital_gdf=digital_gdf, budget=budget)
+    return tile, positive_points, negative_points
+
+# 스레드 풀 없이 바로 실행 (화면 표시 모드 등)
+def _run_now(fn, *args):
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+def run_in_memory(polygon_file, digital_file, orthophoto_path, output_path, samPredictor, workers=4, queue_size=None, batch_size=1, margin_ratio=0.6, prompt_budget=None):
+    """
+    polygon_file, digital_file: 지역 전체 추론 폴리곤 / 수치지도 Shapefile
+    output_path: 결과 파일 (.gpkg 또는 .parquet), 컬럼은 tile_id(=후보 번호), geometry
+    workers: 타일 준비 스레드 수 (0이면 메인 스레드에서 순차 실행)
+    prompt_budget: 타일별 프롬프트 개수 제한 (PromptBudget, None이면 제한 없음)
+    """
+    if queue_size is None:
+        queue_size = max(2 * workers, batch_size)
+
+    polygon_gdf, digital_map = load_inputs(polygon_file, digital_file)
+    candidates = find_underseg_candidates(polygon_gdf, digital_map)
+    pending = deque()  # 준비 중인 타일 (최대 queue_size개)
+
+    with PolygonStore(output_path) as store, OrthophotoReader(orthophoto_path) as reader, ThreadPoolExecutor(max(1, workers)) as pool:
+        submit = pool.submit if workers > 0 else _run_now
+
+        # 다음 후보들의 타일 준비를 미리 요청
+        def fill_pending():
+            while len(pending) < queue_size:
+                candidate = next(candidates, None)
+                if candidate is None:
+                    return
+                pending.append((candidate[0], submit(prepare_candidate_tile, reader, *candidate, margin_ratio, prompt_budget)))
+
+        fill_pending()
+        while pending:
+            # 준비된 타일을 batch_size개까지 모음
+            batch = []
+            while pending and len(batch) < batch_size:
+                candidate_id, future = pending.popleft()
+                fill_pending()
+                prepared = future.result()
+                if prepared is None:
+                    print(f"⚠️ 후보 {candidate_id}: 정사영상 범위 밖이므로 건너뜁니다.")
+                    continue
+                batch.append((candidate_id, *prepared))
+                print(f"Processing candidate {candidate_id}")
+            if not batch:
+                continue
+
+            # 추론
+            if batch_size == 1:
+                _, tile, positive_points, negative_points = batch[0]
+                masks = [generate_fastsam_mask(tile, positive_points, negative_points, samPredictor)]
+            else:
+                masks = generate_fastsam_masks_batch([item[1] for item in batch], [item[2:] for item in batch], samPredictor, batch_size)
+
+            # 폴리곤 변환 후 저장소에 추가
+            for (candidate_id, tile, _, _), mask in zip(batch, masks):
+                store.add(candidate_id, mask_to_tile_polygons(tile, mask), tile.crs)
+    return store
+
+# model / backend / onnx_threads / prompt_budget: process_main.main과 같음
+def main(diagnostics_mode="off", workers=4, batch_size=1, model="FastSAM-x.pt", backend="torch", onnx_threads=None, prompt_budget=None):
+    # 현재 src 폴더 기준으로 data 폴더 경로 설정
+    BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))  # src의 부모 디렉토리
+    DATA_DIR = os.path.join(BASE_DIR, "data")
+
+    polygon_file = os.path.normpath(os.path.join(DATA_DIR, "All infer Polygon Folder/poly.shp"))  # 기존 추론 폴리곤
+    digital_file = os.path.normpath(os.path.join(DATA_DIR, "All digitalMap Folder/digital.shp"))
+    orthophoto_path = os.path.normpath(os.path.join(DATA_DIR, "Some_Region_Drone_Image.tif"))
+    OUTPUT_DIR = os.path.join(DATA_DIR, "Output_Folder_Path")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # 진단 그림 출력 방식 설정 (화면 표시는 메인 스레드에서만 가능)
+    diagnostics.configure(diagnostics_mode, output_dir=os.path.join(OUTPUT_DIR, "diagnostics"))
+    if diagnostics_mode == "interactive":
+        workers = 0
+
+    predictor = create_fastsam_predictor(model, backend=backend, intra_op_threads=onnx_threads)
+    run_in_memory(polygon_file, digital_file, orthophoto_path, os.path.join(OUTPUT_DIR, "samPoly.gpkg"), predictor, workers, batch_size=batch_size, prompt_budget=prompt_budget)
+
+    # 백그라운드에서 저장 중인 그림이 끝날 때까지 대기
+    diagnostics.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+정제 단계별 실행 시간 / 메모리 / 개수를 타일마다 JSON 한 줄로 기록
+- configure(path)로 켜면 tile(tile_id) 구간 안의 stage(name) 시간과 RSS, count()로 넘긴 개수를 모아 구간이 끝날 때 기록
+- 꺼져 있거나 tile() 구간 밖이면 stage() / count()는 아무 일도 하지 않음 (비용 거의 없음)
+- 파이프라인 워커 프로세스도 같은 파일에 자기 몫의 줄을 추가, summary()는 파일 전체를 tile_id로 합쳐 백분위 요약
+- 메모리: rss_delta_mb는 구간 시작 → 끝의 현재 RSS 변화 (타일별), process_peak_rss_mb는 프로세스 전체의 최대 RSS (오래 사는 워커에서는 지금까지의 최대)
+- 여러 타일을 묶어 추론한 구간은 batch=True로 기록하고 (tile_id "id1,id2,..."), 요약에서 타일별 백분위와 따로 표시
+JSON 예: {"tile_id": "12", "batch": false, "pid": 4321, "wall_ms": 812.4, "rss_delta_mb": 35.2, "process_peak_rss_mb": 1450.2,
+          "stages": {"everything_inference": {"ms": 640.1, "calls": 1, "rss_mb": 1432.0}, ...}, "counts": {"positive_points": 84, ...}}
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_path = None
+_file = None
+_lock = threading.Lock()
+_local = threading.local()
+_NULL = contextlib.nullcontext()
+
+def configure(path=None, mode="a"):
+    """
+    path: JSON lines 파일 (None이면 끔)
+    mode: "w"(새로 시작, 실행을 시작하는 메인 프로세스) / "a"(이어서 기록, 워커 프로세스)
+    """
+    global _path, _file
+    close()
+    _path = path
+    if path is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if mode == "w":
+            open(path, "w").close()
+        # 여러 프로세스가 같은 파일에 쓰므로 항상 append 모드 (줄 단위 write는 파일 끝에 붙음)
+        _file = open(path, "a", encoding="utf-8")
+
+def enabled():
+    return _file is not None
+
+def output_path():
+    return _path
+
+def close():
+    global _file
+    if _file is not None:
+        _file.close()
+        _file = None
+
+# 현재 RSS / 프로세스 전체의 최대 RSS [MB] (지원하지 않는 환경이면 None)
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def process_peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # macOS는 byte, Linux는 KB
+
+class TileRecord:
+    def __init__(self, tile_id, batch=False):
+        self.tile_id = str(tile_id)
+        self.batch = batch
+        self.stages = {}
+        self.counts = {}
+        self._start = time.perf_counter()
+        self._start_rss = current_rss_mb()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, {"ms": 0.0, "calls": 0, "rss_mb": None})
+            stage["ms"] += (time.perf_counter() - start) * 1000
+            stage["calls"] += 1
+            stage["rss_mb"] = current_rss_mb()
+
+    def count(self, values):
+        for name, value in values.items():
+            self.counts[name] = self.counts.get(name, 0) + int(value)
+
+    def to_dict(self):
+        end_rss = current_rss_mb()
+        return {"tile_id": self.tile_id, "batch": self.batch, "pid": os.getpid(),
+                "wall_ms": (time.perf_counter() - self._start) * 1000,
+                "rss_delta_mb": None if end_rss is None or self._start_rss is None else end_rss - self._start_rss,
+                "process_peak_rss_mb": process_peak_rss_mb(), "stages": self.stages, "counts": self.counts}
+
+# 타일 하나의 기록 구간 (끝나면 JSON 한 줄 기록), 꺼져 있으면 아무 일도 하지 않음
+# batch=True면 여러 타일을 묶어 처리한 구간 (tile_id는 "id1,id2,...")
+@contextlib.contextmanager
+def tile(tile_id, batch=False):
+    if _file is None:
+        yield None
+        return
+    record = TileRecord(tile_id, batch)
+    previous = getattr(_local, "record", None)
+    _local.record = record
+    try:
+        yield record
+    finally:
+        _local.record = previous
+        line = json.dumps(record.to_dict(), ensure_ascii=False)
+        with _lock:
+            if _file is not None:
+                _file.write(line + "\n")
+                _file.flush()
+
+def stage(name):
+    record = getattr(_local, "record", None)
+    return _NULL if record is None else record.stage(name)
+
+def count(**values):
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record.count(values)
+
+# 워커 프로세스에서 fn을 tile_id의 기록 구간 안에서 실행 (프로세스 풀에 제출하는 용도)
+def traced(tile_id, fn, *args):
+    with tile(tile_id):
+        return fn(*args)
+
+# 기록 파일 읽기: 같은 tile_id의 여러 줄(프로세스별)을 하나로 합침 (배치 기록은 타일 기록과 따로)
+def load_records(path):
+    merged = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            batch = record.get("batch", False)
+            tile_record = merged.setdefault((record["tile_id"], batch), {"tile_id": record["tile_id"], "batch": batch, "wall_ms": 0.0,
+                                                                         "rss_delta_mb": None, "process_peak_rss_mb": None, "stages": {}, "counts": {}})
+            tile_record["wall_ms"] += record["wall_ms"]
+            if record.get("rss_delta_mb") is not None:
+                tile_record["rss_delta_mb"] = (tile_record["rss_delta_mb"] or 0.0) + record["rss_delta_mb"]
+            if record.get("process_peak_rss_mb") is not None:
+                tile_record["process_peak_rss_mb"] = max(tile_record["process_peak_rss_mb"] or 0, record["process_peak_rss_mb"])
+            for name, stage in record["stages"].items():
+                tile_record["stages"][name] = tile_record["stages"].get(name, 0.0) + stage["ms"]
+            for name, value in record["counts"].items():
+                tile_record["counts"][name] = tile_record["counts"].get(name, 0) + value
+    return list(merged.values())
+
+# 기록 묶음의 단계별 시간 / 메모리 변화 / 개수 백분위 표
+def _print_table(records, total_name, percentiles):
+    names = ["p" + str(p) for p in percentiles]
+    rows = {total_name: [record["wall_ms"] for record in records]}
+    for record in records:
+        for name, ms in record["stages"].items():
+            rows.setdefault(name, []).append(ms)
+    counts = {}
+    for record in records:
+        for name, value in record["counts"].items():
+            counts.setdefault(name, []).append(value)
+    deltas = [record["rss_delta_mb"] for record in records if record["rss_delta_mb"] is not None]
+
+    print(f"{'stage':>24} {'n':>6} " + " ".join(f"{name + '[ms]':>10}" for name in names) + f" {'max[ms]':>10} {'total[s]':>9}")
+    for name, values in rows.items():
+        values = np.asarray(values)
+        print(f"{name:>24} {len(values):>6} " + " ".join(f"{value:>10.1f}" for value in np.percentile(values, percentiles))
+              + f" {values.max():>10.1f} {values.sum() / 1000:>9.2f}")
+    if deltas:
+        print(f"{'rss_delta[MB]':>24} {len(deltas):>6} " + " ".join(f"{value:>10.1f}" for value in np.percentile(deltas, percentiles)) + f" {max(deltas):>10.1f}")
+    for name, values in counts.items():
+        print(f"{name:>24} {len(values):>6} " + " ".join(f"{value:>10.0f}" for value in np.percentile(values, percentiles)) + f" {max(values):>10.0f}")
+
+def summary(path=None, percentiles=(50, 90, 99)):
+    """
+    단계별 시간 [ms], 타일별 RSS 변화 [MB], 개수의 백분위 요약 출력 (path가 None이면 현재 기록 파일)
+    여러 타일을 묶어 추론한 배치 기록은 타일별 백분위에 섞지 않고 따로 요약
+    """
+    path = path or _path
+    if path is None or not os.path.exists(path):
+        return None
+    if _file is not None:
+        _file.flush()
+    records = load_records(path)
+    if not records:
+        print("⚠️ 단계별 기록이 없습니다.")
+        return None
+
+    tiles = [record for record in records if not record["batch"]]
+    batches = [record for record in records if record["batch"]]
+    if tiles:
+        print(f"📊 단계별 시간 요약 (타일 {len(tiles)}개, {path})")
+        _print_table(tiles, "tile_total", percentiles)
+    if batches:
+        n_tiles = sum(len(record["tile_id"].split(",")) for record in batches)
+        print(f"📊 배치 추론 요약 (배치 {len(batches)}개, 타일 {n_tiles}개, 배치 전체의 시간)")
+        _print_table(batches, "batch_total", percentiles)
+    peaks = [record["process_peak_rss_mb"] for record in records if record["process_peak_rss_mb"] is not None]
+    if peaks:
+        print(f"프로세스 최대 RSS: {max(peaks):.0f} MB")
+    return records
@@ -3,16 +3,18 @@ import os
 import numpy as np
 import geopandas as gpd
 from shapely.geometry import Polygon
-import matplotlib.pyplot as plt
-import rasterio
 from prompt_generator import createPoints
 from apply_sam import generate_fastsam_mask
+from tile_context import load_tile
+from geo_transform import pixel_to_world
+from run_manifest import replace_shapefile
+import diagnostics
+import instrumentation
 
 # TIFF 영상에서 변환 정보 가져오기
-def get_tiff_transform(tiff_path):
-    with rasterio.open(tiff_path) as dataset:
-        print("TIFF 크기:", dataset.shape)
-        return dataset.transform, dataset.crs
+def get_tiff_transform(tile):
+    print("TIFF 크기:", tile.shape)
+    return tile.transform, tile.crs
 
 # 이미지 로드 및 이진화
 def load_binary_mask(image_path):
@@ -21,14 +23,13 @@ def load_binary_mask(image_path):
     return binary_mask
 
 # 마스크 사이즈를 원본 TIF 크기에 맞게 조정하는 함수
-def resize_mask_to_tif(mask, tif_path):
+def resize_mask_to_tif(mask, tile):
 
     if mask is None or mask.size == 0:
         print("Error : Empty mask array provided")
         return None
     # 원본 TIF 파일 크기 가져오기
-    with rasterio.open(tif_path) as src:
-        orig_width, orig_height = src.width, src.height
+    orig_width, orig_height = tile.width, tile.height
 
     # 마스크 원본 크기 가져오기
     # sam_height, sam_width = mask.shape[:2]
@@ -48,21 +49,28 @@ def mask_to_polygons(mask, transform):
     polygons = []
     for contour in contours:
         if len(contour) >= 4:  # 최소 4개의 점이 필요
-            geo_coords = [rasterio.transform.xy(transform, y, x) for x, y in contour[:, 0, :]]
-            polygon = Polygon(geo_coords)
+            xs, ys = pixel_to_world(transform, contour[:, 0, 1], contour[:, 0, 0])
+            polygon = Polygon(np.column_stack([xs, ys]))
             polygons.append(polygon)
     return polygons
 
-# 폴리곤을 시각화
-def visualize_polygons(mask, polygons):
+# 마스크 시각화
+def draw_mask(ax, mask):
+    ax.imshow(mask, cmap="gray")
+    ax.set_title(f"Building Mask (FastSAM)")
+    ax.axis("off")  # 축 제거
+
+def draw_contours(ax, mask):
     visualization = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
     contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     cv2.drawContours(visualization, contours, -1, (0, 255, 0), 2)
-    plt.figure(figsize=(8, 6))
-    plt.imshow(visualization, cmap='gray')
-    plt.title("Extracted Contours")
-    plt.axis("off")
-    plt.show()
+    ax.imshow(visualization, cmap='gray')
+    ax.set_title("Extracted Contours")
+    ax.axis("off")
+
+# 폴리곤을 시각화
+def visualize_polygons(mask, polygons, tag="tile"):
+    diagnostics.emit(tag, "contours", draw_contours, mask)
 
 # 폴리곤을 Shapefile로 저장
 def save_polygons_as_shapefile(polygons, crs, output_path):
@@ -70,35 +78,64 @@ def save_polygons_as_shapefile(polygons, crs, output_path):
         print("Warning: No polygons to save. Shapefile not created.")
         return
     gdf = gpd.GeoDataFrame({'geometry': polygons}, crs=crs)
-    gdf.to_file(output_path)
+    replace_shapefile(gdf, output_path)  # 임시 폴더에 모두 쓴 뒤 교체 (완료 여부는 process_main의 실행 기록으로 판단)
     print(f"폴리곤 {len(polygons)}개를 검출하여 {output_path}에 저장했습니다.")
 
-# 전체 실행 코드
-def extract_polygons_from_sam(tiff_path, poly_path, digit_path, output_file, samPredictor):
-    
-    # 0. 프롬프트 생성
-    positive_points, negative_points = createPoints(tifPath=tiff_path, polyPath=poly_path, digitPath=digit_path)
-
-    # 1. SAM 마스크 생성
-    mask = generate_fastsam_mask(tiff_path, positive_points, negative_points, samPredictor)
-
+# 프롬프트 생성 단계 (타일 읽기 + 포인트 생성), budget은 createPoints의 PromptBudget
+def prepare_prompts(tiff_path, poly_path, digit_path, budget=None):
+    # 타일을 한 번만 열어 모든 단계에서 공유
+    with instrumentation.stage("load_tile"):
+        tile = load_tile(tiff_path)
+    with instrumentation.stage("prompt_generation"):
+        positive_points, negative_points = createPoints(tifPath=tiff_path, polyPath=poly_path, digitPath=digit_path, tile=tile, budget=budget)
+    return tile, positive_points, negative_points
+
+# 벡터화 단계 (마스크 → 타일 좌표계 폴리곤, 저장 없음)
+def mask_to_tile_polygons(tile, mask):
     # 2. 마스크 사이즈 조정
-    resized_mask = resize_mask_to_tif(mask, tiff_path)
+    with instrumentation.stage("resize"):
+        resized_mask = resize_mask_to_tif(mask, tile)
 
-    plt.figure(figsize=(10, 6))
-    plt.imshow(resized_mask, cmap="gray")
-    plt.title(f"Building Mask (FastSAM)")
-    plt.axis("off")  # 축 제거
-    plt.show()
+    if resized_mask is not None:
+        diagnostics.emit(diagnostics.tile_tag(tile), "mask", draw_mask, resized_mask, figsize=(10, 6))
 
     # 3. TIFF의 변환 정보 가져오기
-    transform, crs = get_tiff_transform(tiff_path)
+    transform, crs = get_tiff_transform(tile)
 
     # 4. 마스크를 TIFF 좌표계의 폴리곤으로 변환
-    polygons = mask_to_polygons(resized_mask, transform)
+    with instrumentation.stage("vectorization"):
+        polygons = mask_to_polygons(resized_mask, transform)
+    instrumentation.count(polygons=len(polygons or []))
 
     # 5. 시각화
     # visualize_polygons(resized_mask, polygons)
+    return polygons
+
+# 벡터화 및 저장 단계 (마스크 → 폴리곤 → Shapefile), output_file이 None이면 저장하지 않고 폴리곤만 반환
+def write_polygons(tile, mask, output_file=None):
+    polygons = mask_to_tile_polygons(tile, mask)
 
     # 6. Shapefile 저장
-    save_polygons_as_shapefile(polygons, crs, output_file)
\ No newline at end of file
+    if output_file is not None:
+        with instrumentation.stage("write"):
+            save_polygons_as_shapefile(polygons, tile.crs, output_file)
+    return polygons
+
+# 전체 실행 코드 (store가 있으면 타일별 Shapefile 대신 PolygonStore에 tile_id로 추가)
+# instrumentation이 켜져 있으면 단계별 시간 / 메모리 / 개수를 타일마다 한 줄로 기록
+def extract_polygons_from_sam(tiff_path, poly_path, digit_path, output_file, samPredictor, store=None, tile_id=None, budget=None):
+    with instrumentation.tile(tile_id if tile_id is not None else os.path.basename(tiff_path)):
+
+        # 0. 프롬프트 생성
+        tile, positive_points, negative_points = prepare_prompts(tiff_path, poly_path, digit_path, budget)
+
+        # 1. SAM 마스크 생성
+        mask = generate_fastsam_mask(tile, positive_points, negative_points, samPredictor)
+
+        # 2~6. 폴리곤 변환 및 저장
+        if store is None:
+            write_polygons(tile, mask, output_file)
+        else:
+            polygons = write_polygons(tile, mask)
+            with instrumentation.stage("write"):
+                store.add(tile_id, polygons, tile.crs)
@@ -0,0 +1,73 @@
+"""
+FastSAM everything 추론을 ONNX Runtime(CPU)으로 실행하는 predictor (GPU가 없는 정제 노드용)
+- export_onnx : .pt 가중치를 ONNX로 한 번만 내보내 가중치 옆에 캐시 (FastSAM-x.pt → FastSAM-x.onnx), .pt가 더 새로우면 다시 내보냄
+- OnnxFastSAMPredictor : FastSAMPredictor의 전처리(letterbox) / NMS / 마스크 후처리 / prompt()를 그대로 쓰고 모델 실행만 ONNX Runtime 세션으로 바꿈
+  세션의 intra-op(연산 하나를 나누는) / inter-op(연산 여러 개를 동시에) 스레드 수를 지정
+  세션은 ultralytics ONNXBackend가 지정한 SessionOptions로 한 번만 만들므로 dynamic / fp16 등 세션에서 구하는 값도 그 세션 기준
+입력 크기가 가변(dynamic)인 ONNX로 내보내므로 PyTorch와 같이 최소 여백 letterbox를 사용
+onnx, onnxruntime 패키지가 필요 (pip install onnx onnxruntime), ultralytics는 requirement.txt의 버전 범위에서 확인
+"""
+
+import os
+import functools
+import torch
+from ultralytics import FastSAM
+from ultralytics.models.fastsam import FastSAMPredictor
+from ultralytics.nn.autobackend import AutoBackend
+from ultralytics.nn.backends import ONNXBackend
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# 가중치 .pt 옆의 ONNX 파일 (없거나 .pt보다 오래되었으면 내보냄)
+def export_onnx(model_path, imgsz=640, opset=None):
+    onnx_path = os.path.splitext(model_path)[0] + ".onnx"
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(model_path):
+        return onnx_path
+
+    print(f"📦 ONNX 내보내기: {os.path.basename(model_path)} → {os.path.basename(onnx_path)}")
+    exported = FastSAM(model_path).export(format="onnx", imgsz=imgsz, dynamic=True, opset=opset, device="cpu")
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    return onnx_path
+
+# CPU 세션 옵션 (스레드 수가 None이면 ONNX Runtime 기본값 = 물리 코어 수)
+def session_options(intra_op_threads=None, inter_op_threads=1):
+    options = onnxruntime.SessionOptions()
+    if intra_op_threads is not None:
+        options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads is not None:
+        options.inter_op_num_threads = inter_op_threads
+        if inter_op_threads > 1:
+            options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+class OnnxFastSAMPredictor(FastSAMPredictor):
+    def __init__(self, onnx_path, overrides=None, intra_op_threads=None, inter_op_threads=1):
+        """
+        onnx_path: export_onnx로 만든 ONNX 파일
+        overrides: FastSAMPredictor와 같은 설정 (conf, iou 등), model / device는 onnx_path / cpu로 고정
+        """
+        if onnxruntime is None:
+            raise ImportError("ONNX 백엔드에는 onnxruntime이 필요합니다 (pip install onnx onnxruntime)")
+        self.onnx_path = onnx_path
+        self.intra_op_threads, self.inter_op_threads = intra_op_threads, inter_op_threads
+        super().__init__(overrides={**(overrides or {}), "model": onnx_path, "device": "cpu"})
+
+    # 스레드 수를 지정한 SessionOptions로 ONNXBackend를 만들도록 한 AutoBackend (CPU)
+    def setup_model(self, model, verbose=True):
+        self.model = session_autobackend(session_options(self.intra_op_threads, self.inter_op_threads))(
+            model=model or self.args.model, device=torch.device("cpu"), fp16=False, verbose=verbose)
+        self.device = self.model.device
+        self.model.eval()
+
+# "onnx" 형식의 backend를 session_options를 넘긴 ONNXBackend로 만드는 AutoBackend
+# AutoBackend는 형식별 backend 생성자를 _BACKEND_MAP에서 찾으므로 "onnx" 항목만 바꿈 (ultralytics가 바뀌면 조용히 지나가지 않도록 확인)
+def session_autobackend(options):
+    backend_map = getattr(AutoBackend, "_BACKEND_MAP", None)
+    if not isinstance(backend_map, dict) or backend_map.get("onnx") is not ONNXBackend:
+        raise RuntimeError("이 ultralytics 버전에서는 ONNX 세션 옵션을 지정할 수 없습니다 (requirement.txt의 ultralytics 버전을 사용하세요)")
+    return type("SessionAutoBackend", (AutoBackend,), {"_BACKEND_MAP": {**backend_map, "onnx": functools.partial(ONNXBackend, session_options=options)}})
@@ -0,0 +1,89 @@
+"""
+타일 단위 정제 작업을 단계별로 겹쳐 실행하는 파이프라인
+- 프롬프트 생성 (프로세스 풀, CPU) : 타일 읽기, 그림자 감지, 격자 분류
+- 추론 (메인 프로세스, 단일)       : FastSAM predictor를 혼자 소유, batch_size개 타일씩 묶어 추론
+- 저장 (프로세스 풀)               : 마스크 → 폴리곤 → Shapefile (store가 있으면 폴리곤을 메인 프로세스의 PolygonStore에 추가)
+단계 사이는 크기가 제한된 큐로 연결되어, 앞 단계가 너무 앞서 나가 메모리를 쓰지 않도록 함
+instrumentation이 켜져 있으면 각 프로세스가 자기가 맡은 단계의 기록을 같은 파일에 추가 (summary에서 tile_id로 합침)
+"""
+
+import os
+import dataclasses
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from mask_to_vector import prepare_prompts, write_polygons
+from apply_sam import generate_fastsam_mask, generate_fastsam_masks_batch
+import diagnostics
+import instrumentation
+
+# 워커 프로세스 초기화 (진단 그림 / 단계별 기록 설정을 메인 프로세스와 같게)
+def _init_worker(diagnostics_mode, diagnostics_dir, metrics_path):
+    diagnostics.configure(diagnostics_mode, diagnostics_dir)
+    instrumentation.configure(metrics_path, mode="a")
+
+def _finish(job, future, crs, store, on_written):
+    polygons = future.result()  # 저장 단계의 예외를 메인 프로세스로 전달
+    if store is None:
+        print(f"✅ {os.path.basename(job[0])} → {job[3]}")
+        if on_written is not None:
+            on_written(job)
+    else:
+        with instrumentation.tile(job[4]), instrumentation.stage("write"):
+            store.add(job[4], polygons, crs)  # 하나의 파일에 기록하는 것은 메인 프로세스만
+
+def run_pipeline(jobs, samPredictor, prompt_workers=None, writer_workers=2, queue_size=None, batch_size=1, diagnostics_mode="off", diagnostics_dir=None, store=None, prompt_budget=None, on_written=None):
+    """
+    jobs: (tiff_path, poly_path, digit_path, output_file, tile_id) 목록, 입력 순서대로 처리
+    batch_size: 한 번에 추론할 타일 수 (1이면 타일별 generate_fastsam_mask와 동일)
+    store: PolygonStore (None이면 타일마다 output_file Shapefile 저장)
+    prompt_budget: 타일별 프롬프트 개수 제한 (PromptBudget, None이면 제한 없음)
+    on_written: Shapefile 저장이 끝난 타일마다 job으로 호출 (store를 쓰면 store의 on_flush 사용)
+    """
+    if prompt_workers is None:
+        prompt_workers = max(1, (os.cpu_count() or 2) // 2)
+    if queue_size is None:
+        queue_size = max(2 * prompt_workers, batch_size)
+
+    jobs = iter(jobs)
+    prompt_queue = deque()  # 프롬프트 생성 중인 타일 (최대 queue_size개)
+    write_queue = deque()   # 저장 중인 타일 (최대 queue_size개)
+    pool_options = {"initializer": _init_worker, "initargs": (diagnostics_mode, diagnostics_dir, instrumentation.output_path())}
+
+    with ProcessPoolExecutor(prompt_workers, **pool_options) as prompt_pool, ProcessPoolExecutor(writer_workers, **pool_options) as writer_pool:
+
+        # 다음 타일들의 프롬프트 생성을 미리 요청
+        def fill_prompt_queue():
+            while len(prompt_queue) < queue_size:
+                job = next(jobs, None)
+                if job is None:
+                    return
+                prompt_queue.append((job, prompt_pool.submit(instrumentation.traced, job[4], prepare_prompts, *job[:3], prompt_budget)))
+
+        fill_prompt_queue()
+        while prompt_queue:
+            # 프롬프트가 준비된 타일을 batch_size개까지 모음
+            batch = []
+            while prompt_queue and len(batch) < batch_size:
+                job, future = prompt_queue.popleft()
+                fill_prompt_queue()
+                batch.append((job, *future.result()))
+                print(f"Processing {job[0]} → {job[3] if store is None else f'{store.path} (tile_id={job[4]})'}")
+
+            # 추론 (predictor는 메인 프로세스에서만 사용)
+            # 단계별 기록: 묶어서 추론한 경우 배치 기록 (tile_id "id1,id2,...", 배치 전체의 시간)
+            with instrumentation.tile(",".join(str(item[0][4]) for item in batch), batch=batch_size > 1):
+                if batch_size == 1:
+                    _, tile, positive_points, negative_points = batch[0]
+                    masks = [generate_fastsam_mask(tile, positive_points, negative_points, samPredictor)]
+                else:
+                    masks = generate_fastsam_masks_batch([item[1] for item in batch], [item[2:] for item in batch], samPredictor, batch_size)
+
+            # 저장 단계로 전달 (영상 픽셀은 더 이상 필요 없으므로 제외)
+            for (job, tile, _, _), mask in zip(batch, masks):
+                if len(write_queue) >= queue_size:
+                    _finish(*write_queue.popleft(), store, on_written)
+                output_file = job[3] if store is None else None
+                write_queue.append((job, writer_pool.submit(instrumentation.traced, job[4], write_polygons, dataclasses.replace(tile, image=None), mask, output_file), tile.crs))
+
+        while write_queue:
+            _finish(*write_queue.popleft(), store, on_written)
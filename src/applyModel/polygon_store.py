@@ -0,0 +1,147 @@
+"""
+정제 폴리곤을 하나의 파일에 tile_id와 함께 누적 저장 (타일마다 Shapefile을 만들지 않음)
+- GeoPackage (.gpkg)    : 기본값, flush 한 번이 append 트랜잭션 하나, tile_id 인덱스 생성
+- GeoParquet (.parquet) : pyarrow 필요, flush 한 번이 row group 하나
+add()로 모은 타일을 batch_tiles개마다 한 번에 기록하므로 중간에 중단되어도 이전 배치까지는 온전히 남음
+on_flush(tile_ids)는 기록이 끝난 배치의 tile_id 목록으로 호출 (실행 기록 등, 빈 타일 포함)
+"""
+
+import os
+import json
+import sqlite3
+import shapely
+import pandas as pd
+import geopandas as gpd
+
+FORMATS = {".gpkg": "gpkg", ".parquet": "parquet"}
+DELETE_CHUNK = 500  # SQL 변수 개수 제한(오래된 SQLite는 999)보다 작게
+
+class PolygonStore:
+    def __init__(self, path, layer="samPoly", batch_tiles=64, mode="w", on_flush=None):
+        """
+        path: 결과 파일 (.gpkg 또는 .parquet)
+        mode: "w"(기존 파일을 지우고 새로 시작) / "a"(기존 GeoPackage에 이어서 기록)
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in FORMATS:
+            raise ValueError(f"Unknown polygon store format: {path} (choose from {list(FORMATS)})")
+        if mode not in ("w", "a"):
+            raise ValueError(f"Unknown mode: {mode}")
+
+        self.path, self.layer, self.batch_tiles = path, layer, batch_tiles
+        self.format = FORMATS[extension]
+        if self.format == "parquet" and mode == "a":
+            raise ValueError("GeoParquet store cannot be reopened for append, use .gpkg")
+
+        self._frames = []     # 아직 기록하지 않은 타일별 GeoDataFrame
+        self._pending = []    # 아직 기록하지 않은 tile_id (빈 타일 포함)
+        self._on_flush = on_flush
+        self._crs = None
+        self._writer = None   # GeoParquet writer
+        self._schema = None
+        self.tiles = 0
+        self.polygons = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._exists = mode == "a" and os.path.exists(path)
+        if mode == "w" and os.path.exists(path):
+            os.remove(path)
+
+    # 타일 하나의 폴리곤 추가 (빈 타일도 개수에는 포함)
+    def add(self, tile_id, polygons, crs):
+        if self._crs is None:
+            self._crs = crs
+        elif crs is not None and crs != self._crs:
+            print(f"⚠️ 좌표계 정보가 다릅니다: {crs} (저장소: {self._crs})")
+
+        if polygons:
+            self._frames.append(gpd.GeoDataFrame({"tile_id": [str(tile_id)] * len(polygons)}, geometry=list(polygons), crs=self._crs))
+            self.polygons += len(polygons)
+        self._pending.append(str(tile_id))
+        self.tiles += 1
+        if len(self._pending) >= self.batch_tiles:
+            self.flush()
+
+    # 모아 둔 타일을 한 번에 기록
+    def flush(self):
+        if self._frames:
+            gdf = gpd.GeoDataFrame(pd.concat(self._frames, ignore_index=True), crs=self._crs)
+            if self.format == "gpkg":
+                self._write_gpkg(gdf)
+            else:
+                self._write_parquet(gdf)
+        flushed, self._frames, self._pending = self._pending, [], []
+        if flushed and self._on_flush is not None:
+            self._on_flush(flushed)
+
+    # 기존 GeoPackage에서 tile_id의 폴리곤 삭제 (이어서 실행할 때 다시 계산할 타일의 이전 결과)
+    # DELETE_CHUNK개씩 나누어 삭제하되 하나의 트랜잭션으로 커밋
+    def remove(self, tile_ids):
+        tile_ids = [str(tile_id) for tile_id in tile_ids]
+        if not self._exists or not tile_ids or self.format != "gpkg":
+            return
+        with sqlite3.connect(self.path) as connection:
+            for start in range(0, len(tile_ids), DELETE_CHUNK):
+                chunk = tile_ids[start:start + DELETE_CHUNK]
+                connection.execute(f'DELETE FROM "{self.layer}" WHERE tile_id IN ({",".join("?" * len(chunk))})', chunk)
+        connection.close()
+
+    def _write_gpkg(self, gdf):
+        # append 한 번이 하나의 트랜잭션 (실패하면 이 배치만 기록되지 않음)
+        gdf.to_file(self.path, layer=self.layer, driver="GPKG", mode="a" if self._exists else "w")
+        if not self._exists:
+            with sqlite3.connect(self.path) as connection:
+                connection.execute(f'CREATE INDEX IF NOT EXISTS "idx_{self.layer}_tile_id" ON "{self.layer}" ("tile_id")')
+            connection.close()
+        self._exists = True
+
+    def _write_parquet(self, gdf):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("GeoParquet output requires pyarrow (pip install pyarrow), or use a .gpkg path") from error
+
+        table = pa.table({"tile_id": pa.array(gdf["tile_id"], pa.string()),
+                          "geometry": pa.array(shapely.to_wkb(gdf.geometry.values), pa.binary())})
+        if self._writer is None:
+            # GeoParquet 메타데이터 (geopandas.read_parquet으로 바로 읽을 수 있도록)
+            geo = {"version": "1.0.0", "primary_column": "geometry",
+                   "columns": {"geometry": {"encoding": "WKB", "geometry_types": [],
+                                            "crs": gdf.crs.to_json_dict() if gdf.crs is not None else None}}}
+            self._schema = table.schema.with_metadata({b"geo": json.dumps(geo).encode()})
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(table.replace_schema_metadata(self._schema.metadata))
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        print(f"✅ 폴리곤 {self.polygons}개 ({self.tiles}개 타일)를 {self.path}에 저장했습니다.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # 예외로 끝나더라도 이미 모은 타일은 기록
+        self.close()
+
+# 저장소 파일 읽기 (tile_id를 주면 해당 타일만)
+def read_polygon_store(path, tile_id=None, layer="samPoly"):
+    if os.path.splitext(path)[1].lower() == ".parquet":
+        if tile_id is None:
+            return gpd.read_parquet(path)
+        # 조건을 읽기 단계로 넘겨 다른 타일의 geometry는 메모리에 올리지 않음
+        return gpd.read_parquet(path, filters=[("tile_id", "==", str(tile_id))])
+    if tile_id is None:
+        return gpd.read_file(path, layer=layer)
+    return gpd.read_file(path, layer=layer, where=f"tile_id = '{tile_id}'")
+
+# 저장소에 기록된 tile_id 목록 (geometry는 읽지 않음, 기록된 순서)
+def read_store_tile_ids(path, layer="samPoly"):
+    if os.path.splitext(path)[1].lower() == ".parquet":
+        tile_ids = pd.read_parquet(path, columns=["tile_id"])["tile_id"]
+    else:
+        tile_ids = gpd.read_file(path, layer=layer, columns=["tile_id"], ignore_geometry=True)["tile_id"]
+    return list(dict.fromkeys(tile_ids.astype(str)))
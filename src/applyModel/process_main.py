@@ -6,8 +6,23 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 sys.path.append(BASE_DIR)
 from mask_to_vector import extract_polygons_from_sam
 from apply_sam import create_fastsam_predictor
+from pipeline import run_pipeline
+from polygon_store import PolygonStore
+from run_manifest import RunManifest, run_parameters, tile_fingerprint, shapefile_parts, remove_temp_files
+import diagnostics
+import instrumentation
 
-def main():
+# diagnostics_mode: "off"(무인 실행, 그림 없음) / "file"(출력 폴더에 PNG 저장) / "interactive"(화면 표시)
+# prompt_workers: 프롬프트 생성 프로세스 수 (None이면 CPU 코어 수의 절반, 0이면 파이프라인 없이 순차 실행)
+# batch_size: 파이프라인에서 한 번에 everything 추론할 타일 수
+# output_format: "gpkg" / "parquet"(하나의 파일 samPoly.*에 tile_id와 함께 저장, 병합 불필요) / "shp"(기존처럼 타일마다 samPoly{id}.shp)
+# stage_metrics: 타일별 단계 시간 / 메모리 / 개수를 출력 폴더의 stage_metrics.jsonl에 기록하고 마지막에 백분위 요약 출력
+# model: "x"(FastSAM-x.pt) / "s"(FastSAM-s.pt, 더 빠름) 또는 applyModel 폴더의 모델 파일명
+# backend: "torch" / "onnx"(ONNX Runtime CPU, onnx_threads는 intra-op 스레드 수이며 None이면 ONNX Runtime 기본값)
+# prompt_budget: 프롬프트 개수 제한 PromptBudget(positive, negative, scope="tile" / "component"), None이면 제한 없음
+# resume: 출력 폴더의 run_manifest.jsonl을 보고 입력 파일 / 모델 / 파라미터가 지난 실행과 같은 타일은 건너뜀 (parquet은 지원하지 않음)
+def main(diagnostics_mode="off", prompt_workers=None, writer_workers=2, batch_size=1, output_format="gpkg", stage_metrics=True,
+         model="FastSAM-x.pt", backend="torch", onnx_threads=None, prompt_budget=None, resume=True):
     # 현재 src 폴더 기준으로 data 폴더 경로 설정
     BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))  # src의 부모 디렉토리
     DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -18,12 +33,35 @@ def main():
     OUTPUT_DIR = os.path.join(DATA_DIR, "Output_Folder_Path")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+    # 진단 그림 출력 방식 설정
+    DIAGNOSTICS_DIR = os.path.join(OUTPUT_DIR, "diagnostics")
+    diagnostics.configure(diagnostics_mode, output_dir=DIAGNOSTICS_DIR)
+
+    # 단계별 기록 (워커 프로세스도 같은 파일에 이어서 기록)
+    instrumentation.configure(os.path.join(OUTPUT_DIR, "stage_metrics.jsonl") if stage_metrics else None, mode="w")
+
     # 모델
-    predictor = create_fastsam_predictor()
+    predictor = create_fastsam_predictor(model, backend=backend, intra_op_threads=onnx_threads)
+
+    # 실행 기록 (GeoParquet은 이어서 쓸 수 없어 매번 전체를 새로 만듦)
+    manifest = None
+    if output_format == "parquet":
+        if resume:
+            print("⚠️ parquet 결과는 이어서 기록할 수 없어 모든 타일을 다시 계산합니다 (gpkg / shp는 가능)")
+        resume = False
+    else:
+        manifest = RunManifest(os.path.join(OUTPUT_DIR, "run_manifest.jsonl"), mode="a" if resume else "w")
+        removed = remove_temp_files(OUTPUT_DIR)  # 중단된 실행이 남긴 임시 Shapefile 폴더
+        if removed:
+            print(f"⚠️ 중단된 실행이 남긴 임시 파일 {removed}개를 삭제했습니다")
+        params = run_parameters(predictor, backend=backend, batch_size=batch_size, prompt_budget=prompt_budget, output_format=output_format)
 
     # TIFF 파일 목록 가져오기
     tif_files = glob.glob(os.path.join(ORTHO_DIR, "*.tif"))
-    
+    jobs = []
+    fingerprints = {}
+    skipped = 0
+
     for tif_file in tif_files:
         # 파일명에서 번호 추출
         file_name = os.path.basename(tif_file)
@@ -36,11 +74,64 @@ def main():
         output_file = os.path.join(OUTPUT_DIR, f"samPoly{file_id}.shp")
 
         # 파일 존재 여부 확인 후 실행
-        if os.path.exists(polygon_file):
-            print(f"Processing {tif_file} → {output_file}")
-            extract_polygons_from_sam(tif_file, polygon_file, digit_file, output_file, predictor)
-        else:
+        if not os.path.exists(polygon_file):
             print(f"Skipping {tif_file} (Missing {polygon_file})")
+            continue
+
+        # 입력 지문이 지난 실행과 같고 결과가 남아 있으면 건너뜀
+        if manifest is not None:
+            fingerprints[file_id] = tile_fingerprint(tif_file, polygon_file, digit_file, params)
+            if resume and manifest.is_current(file_id, fingerprints[file_id]):
+                skipped += 1
+                continue
+        jobs.append((tif_file, polygon_file, digit_file, output_file, file_id))
+
+    if skipped:
+        print(f"✅ 지난 실행과 입력이 같은 타일 {skipped}개는 건너뜁니다 (다시 계산할 타일 {len(jobs)}개)")
+
+    # 결과가 모두 기록된 타일만 실행 기록에 추가
+    def record_shapefile(job):
+        manifest.record(job[4], fingerprints[job[4]], shapefile_parts(job[3]))
+
+    def record_store_tiles(tile_ids):
+        for tile_id in tile_ids:
+            manifest.record(tile_id, fingerprints[tile_id], [store.path])
+
+    # 결과 저장소 (shp이면 타일마다 Shapefile)
+    # 이어서 실행하면 기존 GeoPackage에 추가하고, 다시 계산할 타일의 이전 폴리곤은 먼저 삭제
+    store = None
+    if output_format != "shp":
+        store = PolygonStore(os.path.join(OUTPUT_DIR, f"samPoly.{output_format}"), mode="a" if resume else "w",
+                             on_flush=record_store_tiles if manifest is not None else None)
+        store.remove([job[4] for job in jobs])
+    elif manifest is not None:
+        for job in jobs:
+            manifest.remove_outputs(job[4])  # 새 결과에 폴리곤이 없으면 옛 Shapefile이 남지 않도록
+
+    # 화면 표시 모드이거나 워커 수가 0이면 기존처럼 한 타일씩 순차 실행
+    try:
+        if prompt_workers == 0 or diagnostics_mode == "interactive":
+            for tif_file, polygon_file, digit_file, output_file, file_id in jobs:
+                print(f"Processing {tif_file} → {output_file if store is None else f'{store.path} (tile_id={file_id})'}")
+                extract_polygons_from_sam(tif_file, polygon_file, digit_file, output_file, predictor, store, file_id, prompt_budget)
+                if store is None and manifest is not None:
+                    record_shapefile((tif_file, polygon_file, digit_file, output_file, file_id))
+        else:
+            run_pipeline(jobs, predictor, prompt_workers, writer_workers, batch_size=batch_size, diagnostics_mode=diagnostics_mode, diagnostics_dir=DIAGNOSTICS_DIR,
+                         store=store, prompt_budget=prompt_budget, on_written=record_shapefile if store is None and manifest is not None else None)
+    finally:
+        if store is not None:
+            store.close()
+        if manifest is not None:
+            manifest.close()
+
+    # 백그라운드에서 저장 중인 그림이 끝날 때까지 대기
+    diagnostics.close()
+
+    # 단계별 시간 백분위 요약
+    if stage_metrics:
+        instrumentation.summary()
+    instrumentation.close()
 
 if __name__ == "__main__":
     main()
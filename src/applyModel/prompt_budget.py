@@ -0,0 +1,88 @@
+import numpy as np
+from dataclasses import dataclass
+from scipy.ndimage import label
+
+@dataclass(frozen=True)
+class PromptBudget:
+    """
+    타일 하나(scope="tile") 또는 연결 요소 하나(scope="component")에 허용하는 프롬프트 개수
+    positive / negative가 None이면 해당 포인트는 줄이지 않음
+    """
+    positive: int = None
+    negative: int = None
+    scope: str = "tile"
+
+# 연결 요소 (8방향, 격자 칸 기준)
+_STRUCTURE = np.ones((3, 3), dtype=bool)
+
+# 점들을 stride × stride 격자 블록으로 나누어 블록마다 블록 중심에 가장 가까운 점 하나 (블록이 budget개 이하가 되는 stride)
+# 원래 점은 모두 같은 블록에 남은 점이 있으므로, 남은 점에서 stride × space × √2 이내에 있음
+def stratified_indices(ix, iy, budget):
+    n = len(ix)
+    if n <= budget:
+        return np.arange(n)
+    stride = max(1, int(np.sqrt(n / budget)))
+    while True:
+        bx, by = ix // stride, iy // stride
+        keys = bx * (iy.max() // stride + 1) + by
+        n_blocks = len(np.unique(keys))
+        if n_blocks <= budget:
+            break
+        stride = max(stride + 1, int(stride * np.sqrt(n_blocks / budget)))  # 블록 수는 대략 stride²에 반비례
+
+    center = (stride - 1) / 2
+    distance = (ix - bx * stride - center) ** 2 + (iy - by * stride - center) ** 2
+    order = np.lexsort((distance, keys))
+    first = np.concatenate([[True], keys[order][1:] != keys[order][:-1]])
+    return np.sort(order[first])
+
+def thin_grid_mask(mask, grid_shape, budget, scope="tile"):
+    """
+    grid_to_xy 순서의 boolean 배열(mask)에서 budget개 이하의 점만 남김 (공간적으로 고르게, 같은 입력이면 항상 같은 결과)
+    scope="tile"이면 타일 전체에 budget개, "component"면 연결 요소마다 budget개
+    연결 요소마다 최소 한 점은 남기므로 (작은 건물이 통째로 빠지지 않도록) 연결 요소가 budget보다 많으면 그 수만큼 남음
+    """
+    if budget is None or np.count_nonzero(mask) <= (budget if scope == "tile" else 1):
+        return mask
+    if scope not in ("tile", "component"):
+        raise ValueError(f"지원하지 않는 scope입니다: {scope} (tile / component)")
+    if budget < 1:
+        raise ValueError(f"budget은 1 이상이어야 합니다: {budget}")
+
+    labels, n_components = label(mask.reshape(grid_shape), structure=_STRUCTURE)
+    cells = np.flatnonzero(mask)
+    ix, iy = np.unravel_index(cells, grid_shape)
+    components = labels.ravel()[cells]
+
+    keep = np.zeros(len(cells), dtype=bool)
+    if scope == "tile":
+        keep[stratified_indices(ix, iy, budget)] = True
+    else:
+        order = np.argsort(components, kind="stable")
+        for group in np.split(order, np.flatnonzero(np.diff(components[order])) + 1):
+            keep[group[stratified_indices(ix[group], iy[group], budget)]] = True
+
+    # 남은 점이 없는 연결 요소는 요소 중심에 가장 가까운 점 하나를 추가
+    covered = np.zeros(n_components + 1, dtype=bool)
+    covered[components[keep]] = True
+    missing = np.flatnonzero(~covered[components])
+    if len(missing):
+        group, mx, my = components[missing], ix[missing], iy[missing]
+        sizes = np.bincount(group, minlength=n_components + 1)
+        cx = np.bincount(group, mx, n_components + 1)[group] / sizes[group]
+        cy = np.bincount(group, my, n_components + 1)[group] / sizes[group]
+        order = np.lexsort(((mx - cx) ** 2 + (my - cy) ** 2, group))
+        first = np.concatenate([[True], group[order][1:] != group[order][:-1]])
+        keep[missing[order[first]]] = True
+
+    thinned = np.zeros_like(mask)
+    thinned[cells[keep]] = True
+    return thinned
+
+# positive(건물 내부)와 negative(건물 바깥 띠)를 각각 budget에 맞게 줄임
+# negative는 띠 모양의 연결 요소 안에서 고르게 남으므로 띠 둘레를 따라 고르게 분포
+def apply_prompt_budget(positive_mask, negative_mask, grid_shape, budget):
+    if budget is None:
+        return positive_mask, negative_mask
+    return (thin_grid_mask(positive_mask, grid_shape, budget.positive, budget.scope),
+            thin_grid_mask(negative_mask, grid_shape, budget.negative, budget.scope))
@@ -0,0 +1,156 @@
+"""
+중단된 실행을 이어서 하기 위한 타일별 실행 기록 (run manifest)
+- 타일마다 입력 지문(fingerprint)과 결과 파일을 JSON 한 줄로 기록 (줄마다 fsync, 같은 tile_id는 마지막 줄이 유효)
+- 지문: crop TIFF / underSeg 폴리곤 / 수치지도 폴리곤(Shapefile 부속 파일 포함) / 모델 파일의 내용 해시 + 실행 파라미터
+- 다시 실행하면 지문이 같고 결과 파일이 남아 있는 타일은 건너뛰고, 바뀐 타일만 다시 계산
+- 결과는 모두 쓴 뒤에 기록하므로, 중단된 타일은 기록이 없거나 옛 지문이라 다음 실행에서 다시 계산됨
+Shapefile은 여러 파일이라 한 번에 교체할 수 없으므로 (replace_shapefile) 완료 여부는 모든 파일을 옮긴 뒤 쓰는 기록으로만 판단
+- 중단되어 이전/새 부속 파일이 섞여 남아도 기록이 없거나 옛 지문이므로 다음 실행에서 다시 씀
+- 중단되어 남은 임시 파일/폴더(.tmp_*)는 다음 실행을 시작할 때 remove_temp_files로 삭제
+"""
+
+import os
+import json
+import time
+import shutil
+import dataclasses
+import hashlib
+import tempfile
+
+SHAPEFILE_PARTS = (".shp", ".shx", ".dbf", ".prj", ".cpg")
+TEMP_PREFIX = ".tmp_"
+
+# 파일 내용 해시 (Shapefile이면 부속 파일까지), 없는 파일은 None
+def file_digest(path, chunk_size=1 << 20):
+    if path is None:
+        return None
+    paths = shapefile_parts(path) if path.lower().endswith(".shp") else [path] if os.path.exists(path) else []
+    if not paths:
+        return None
+    digest = hashlib.sha256()
+    for part in paths:
+        digest.update(os.path.splitext(part)[1].lower().encode())
+        with open(part, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+# 타일 입력 지문: 입력 파일 해시 + 실행 파라미터 (params는 JSON으로 바꿀 수 있는 값, 모델 해시 등)
+def tile_fingerprint(tif_file, polygon_file, digit_file, params):
+    record = {"tif": file_digest(tif_file), "polygon": file_digest(polygon_file), "digital": file_digest(digit_file), "params": params}
+    return hashlib.sha256(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+# 결과에 영향을 주는 실행 파라미터 (모델 파일은 내용 해시, options는 PromptBudget 등 dataclass도 가능)
+def run_parameters(predictor, **options):
+    model = str(predictor.args.model)
+    params = {"model": file_digest(model) or os.path.basename(model), "conf": predictor.args.conf,
+              "iou": predictor.args.iou, "imgsz": predictor.args.imgsz}
+    for name, value in options.items():
+        params[name] = dataclasses.asdict(value) if dataclasses.is_dataclass(value) else value
+    return params
+
+def shapefile_parts(path):
+    base = os.path.splitext(path)[0]
+    return [base + extension for extension in SHAPEFILE_PARTS if os.path.exists(base + extension)]
+
+# 같은 폴더의 임시 파일에 쓴 뒤 교체 (중단되어도 이전 파일 또는 새 파일 중 하나만 남음)
+def atomic_write_text(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX, suffix=os.path.basename(path))
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+# Shapefile을 임시 폴더에 모두 쓴 뒤 이전 부속 파일을 지우고 새 부속 파일을 옮김 (.shp는 마지막)
+# 파일별 교체라 원자적이지 않음: 옮기는 도중 중단되면 부속 파일이 섞일 수 있으므로, 완료 여부는 이후의 RunManifest.record로 판단
+def replace_shapefile(gdf, output_path):
+    directory = os.path.dirname(os.path.abspath(output_path))
+    temp_dir = tempfile.mkdtemp(dir=directory, prefix=TEMP_PREFIX)
+    try:
+        temp_path = os.path.join(temp_dir, os.path.basename(output_path))
+        gdf.to_file(temp_path)
+        for part in shapefile_parts(output_path):
+            os.remove(part)
+        base = os.path.splitext(output_path)[0]
+        for part in sorted(shapefile_parts(temp_path), key=lambda part: part.lower().endswith(".shp")):
+            os.replace(part, base + os.path.splitext(part)[1])
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+# 중단된 실행이 남긴 임시 파일/폴더 삭제 (같은 폴더에 동시에 실행 중인 작업이 없을 때 호출)
+def remove_temp_files(directory):
+    removed = 0
+    for name in os.listdir(directory):
+        if name.startswith(TEMP_PREFIX):
+            path = os.path.join(directory, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+            removed += 1
+    return removed
+
+# 기록 파일 읽기 (tile_id별 마지막 줄, 중단되어 잘린 마지막 줄은 무시)
+def load_manifest(path):
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["tile_id"]] = entry
+    return entries
+
+class RunManifest:
+    def __init__(self, path, mode="a"):
+        """
+        path: JSON lines 기록 파일 (없으면 새로 만듦)
+        mode: "a"(지난 기록에 이어서) / "w"(지난 기록을 버리고 새로 시작)
+        열 때 타일별 마지막 기록만 남기도록 정리하여 다시 씀 (잘린 줄 제거)
+        """
+        self.path = path
+        self.entries = load_manifest(path) if mode == "a" else {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        atomic_write_text(path, "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in self.entries.values()))
+        self._file = open(path, "a", encoding="utf-8")
+
+    # 지문이 같고 결과 파일이 모두 남아 있으면 다시 계산할 필요 없음
+    def is_current(self, tile_id, fingerprint):
+        entry = self.entries.get(str(tile_id))
+        return entry is not None and entry["fingerprint"] == fingerprint and all(os.path.exists(path) for path in entry["outputs"])
+
+    def record(self, tile_id, fingerprint, outputs):
+        entry = {"tile_id": str(tile_id), "fingerprint": fingerprint, "outputs": list(outputs),
+                 "completed": time.strftime("%Y-%m-%d %H:%M:%S")}
+        self.entries[entry["tile_id"]] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # 다시 계산할 타일의 이전 결과 파일 삭제 (새 결과에 폴리곤이 없으면 옛 파일이 남지 않도록)
+    def remove_outputs(self, tile_id):
+        entry = self.entries.get(str(tile_id))
+        for path in [] if entry is None else entry["outputs"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
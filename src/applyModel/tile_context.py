@@ -0,0 +1,47 @@
+import numpy as np
+import rasterio
+from dataclasses import dataclass
+from affine import Affine
+from rasterio.coords import BoundingBox
+from rasterio.transform import array_bounds
+
+@dataclass
+class TileContext:
+    """
+    한 타일(정사영상 crop)의 픽셀과 좌표 정보를 한 번만 읽어 모든 단계에서 공유
+    image는 cv2.imread와 같은 (H, W, 3) BGR 배열
+    """
+    image: np.ndarray
+    transform: Affine
+    crs: object
+    bounds: BoundingBox
+    width: int
+    height: int
+    path: str = None
+
+    @property
+    def shape(self):
+        return self.height, self.width
+
+# rasterio 밴드 배열 (C, H, W)을 cv2.imread와 같은 BGR 영상으로 변환
+def bands_to_bgr(bands):
+    if bands.dtype == np.uint16:
+        bands = (bands >> 8).astype(np.uint8)  # 16bit 영상은 상위 바이트만 사용 (cv2.imread와 동일)
+    if bands.shape[0] >= 3:
+        image = bands[2::-1]  # R, G, B → B, G, R (alpha 등 나머지 밴드 제외)
+    else:
+        image = np.repeat(bands[:1], 3, axis=0)  # 흑백 영상은 3채널로 복제
+    return np.ascontiguousarray(image.transpose(1, 2, 0))
+
+# 메모리에 있는 밴드 배열로 타일 생성 (윈도우 읽기 결과 등)
+def tile_from_array(bands, transform, crs, path=None):
+    height, width = bands.shape[1:]
+    bounds = BoundingBox(*array_bounds(height, width, transform))
+    return TileContext(bands_to_bgr(bands), transform, crs, bounds, width, height, path)
+
+# TIFF 파일을 한 번 열어 타일 생성
+def load_tile(tif_path):
+    with rasterio.open(tif_path) as dataset:
+        bands = dataset.read()
+        transform, crs = dataset.transform, dataset.crs
+    return tile_from_array(bands, transform, crs, tif_path)
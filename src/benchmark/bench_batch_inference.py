@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from rasterio.transform import from_origin
+
+# applyModel 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "applyModel"))
+from apply_sam import create_fastsam_predictor
+from tile_context import tile_from_array
+
+# 합성 타일 생성 (밝은 지붕 사각형 + 그림자가 있는 잡음 배경), 크기는 조금씩 다르게
+def make_synthetic_tiles(n_tiles, size=(400, 500), seed=0):
+    rng = np.random.default_rng(seed)
+    tiles = []
+    for i in range(n_tiles):
+        height, width = size[0] + rng.integers(-40, 40), size[1] + rng.integers(-40, 40)
+        bands = rng.integers(80, 140, (3, height, width), dtype=np.uint8)
+        for _ in range(rng.integers(2, 6)):
+            y, x = rng.integers(0, height - 60), rng.integers(0, width - 60)
+            h, w = rng.integers(30, 120, 2)
+            bands[:, y:y + h, x:x + w] = rng.integers(170, 250, (3, 1, 1))
+            bands[:, y + h:y + h + 10, x:x + w] = 25
+        tiles.append(tile_from_array(bands, from_origin(0, height * 0.1, 0.1, 0.1), None, f"synthetic{i}"))
+    return tiles
+
+def main():
+    parser = argparse.ArgumentParser(description="FastSAM everything 추론 처리량 (tiles/sec) vs batch size, CPU")
+    parser.add_argument("--model", default="FastSAM-x.pt", help="applyModel 폴더 기준 모델 파일 또는 절대 경로")
+    parser.add_argument("--tiles", type=int, default=32)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    predictor = create_fastsam_predictor(args.model)
+    predictor.args.device = "cpu"
+    predictor.args.verbose = False
+    tiles = make_synthetic_tiles(args.tiles)
+    images = [tile.image for tile in tiles]
+
+    predictor(images[:1])  # 모델 로드 및 워밍업
+
+    print(f"{'batch':>6} {'tiles/sec':>10} {'sec/tile':>9}")
+    for batch_size in args.batch_sizes:
+        best = np.inf
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            for i in range(0, len(images), batch_size):
+                predictor(images[i:i + batch_size])
+            best = min(best, time.perf_counter() - start)
+        print(f"{batch_size:>6} {len(images) / best:>10.2f} {best / len(images):>9.3f}")
+
+if __name__ == "__main__":
+    main()
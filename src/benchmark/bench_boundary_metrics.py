@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import geopandas as gpd
+from shapely.affinity import translate, rotate
+
+# verification 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "verification"))
+from metrics_engine import compute_overlay, biou_ratio
+from boundary_metrics import compute_boundary_metrics
+from bench_raster_metrics import make_synthetic_tiles
+
+# 타일 여러 개를 겹치지 않게 옮겨 하나의 레이어로 합침 (지역 전체 병합 파일 규모)
+# columns=1이면 세로로 긴 배치, angle [도]만큼 원점 기준으로 회전 (가로로 넓은 배치에서만 맞는 계산을 찾기 위함)
+def merge_tiles(tiles, columns=20, spacing=(90.0, 40.0), angle=0.0):
+    gt, pred = [], []
+    for i, (gt_gdf, pred_gdf) in enumerate(tiles):
+        dx, dy = (i % columns) * spacing[0], (i // columns) * spacing[1]
+        gt.extend(rotate(translate(poly, dx, dy), angle, origin=(0, 0)) for poly in gt_gdf.geometry)
+        pred.extend(rotate(translate(poly, dx, dy), angle, origin=(0, 0)) for poly in pred_gdf.geometry)
+    return gpd.GeoDataFrame(geometry=gt, crs="EPSG:5186"), gpd.GeoDataFrame(geometry=pred, crs="EPSG:5186")
+
+def main():
+    parser = argparse.ArgumentParser(description="BIoU: 경계 buffer 합집합(기존) vs 경계 표본점 + cKDTree (오차, 속도)")
+    parser.add_argument("--tiles", type=int, default=50)
+    parser.add_argument("--cells", type=float, nargs="+", default=[0.4, 0.2, 0.1], help="표본 간격 = 격자 간격 [m]")
+    parser.add_argument("--merged", type=int, nargs="+", default=[50, 200], help="하나로 합쳐 비교할 타일 수")
+    parser.add_argument("--boundary-buffer", type=float, default=2.0)
+    args = parser.parse_args()
+
+    tiles = make_synthetic_tiles(max([args.tiles] + args.merged))
+    cases = [("tile", tiles[:args.tiles])] + [(f"merged{n}", [merge_tiles(tiles[:n])]) for n in args.merged]
+    n = min(args.merged)
+    cases += [(f"tall{n}", [merge_tiles(tiles[:n], columns=1)]), (f"rot{n}", [merge_tiles(tiles[:n], columns=1, angle=30.0)])]
+
+    # 두 방식 모두 같은 GeoDataFrame에서 시작, BIoU에 필요 없는 교차 계산(compute_overlay)은 시간에서 제외
+    overlays = {name: [compute_overlay(gt, pred) for gt, pred in pairs] for name, pairs in cases}
+
+    print(f"{'case':>9} {'cell[m]':>8} {'buffer[ms]':>11} {'kdtree[ms]':>11} {'speedup':>8} {'max|dBIoU|':>11} {'mean|dBIoU|':>12} {'bF1':>6}")
+    for name, pairs in cases:
+        start = time.perf_counter()
+        exact = [biou_ratio(overlay, args.boundary_buffer) for overlay in overlays[name]]
+        buffer_time = (time.perf_counter() - start) / len(pairs)
+
+        for cell in args.cells:
+            start = time.perf_counter()
+            approx = [compute_boundary_metrics(gt, pred, args.boundary_buffer, spacing=cell, cell=cell) for gt, pred in pairs]
+            kdtree_time = (time.perf_counter() - start) / len(pairs)
+
+            errors = np.abs([a["biou_ratio"] - e for a, e in zip(approx, exact)])
+            boundary_f1 = np.mean([a["boundary_f1"] for a in approx])
+            print(f"{name:>9} {cell:>8.2f} {buffer_time * 1000:>11.1f} {kdtree_time * 1000:>11.1f} {buffer_time / kdtree_time:>7.1f}x "
+                  f"{errors.max():>11.4f} {errors.mean():>12.4f} {boundary_f1:>6.3f}")
+    print("(buffer: 기존 poly.boundary.buffer 합집합 BIoU, bF1: 허용 거리 = boundary buffer인 boundary F-score 평균)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import shapely
+import geopandas as gpd
+from shapely.geometry import box
+
+# preprocess 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "preprocess"))
+from extract_underSeg_and_digital_Poly import find_underseg_candidates, find_underseg_candidates_bruteforce
+
+# 합성 도시 생성: 블록마다 건물(수치지도) 여러 채, 추론 폴리곤은 붙어 있는 건물 1~4채를 하나로 덮음 (underSeg)
+def make_synthetic_city(n_blocks=40, buildings_per_block=12, block_size=80.0, seed=0):
+    rng = np.random.default_rng(seed)
+    digital, predicted = [], []
+    for bx in range(n_blocks):
+        for by in range(n_blocks):
+            x0, y0 = bx * block_size, by * block_size
+            x = x0 + 2.0
+            row = []
+            for _ in range(buildings_per_block // 2):
+                w, h = rng.uniform(6, 12), rng.uniform(8, 14)
+                for y in (y0 + 2.0, y0 + 40.0):
+                    row.append(box(x, y, x + w, y + h))
+                x += w + rng.uniform(0.5, 3.0)
+            digital.extend(row)
+
+            # 위/아래 줄을 따라 1~4채씩 묶어 추론 폴리곤 생성
+            for line in (row[0::2], row[1::2]):
+                i = 0
+                while i < len(line):
+                    n = int(rng.integers(1, 5))
+                    group = line[i:i + n]
+                    minx, miny, maxx, maxy = shapely.total_bounds(group)
+                    predicted.append(box(minx + 0.3, miny - 0.5, maxx - 0.3, maxy + 0.5))
+                    i += n
+
+    crs = "EPSG:5186"
+    polygon_gdf = gpd.GeoDataFrame({"cls": np.ones(len(predicted), dtype=int)}, geometry=predicted, crs=crs)
+    digital_map = gpd.GeoDataFrame({"bid": np.arange(len(digital))}, geometry=digital, crs=crs)
+    return polygon_gdf, digital_map
+
+def same_candidates(a, b):
+    if len(a) != len(b):
+        return False
+    for (id_a, pred_a, digi_a), (id_b, pred_b, digi_b) in zip(a, b):
+        if id_a != id_b or not pred_a.equals(pred_b):
+            return False
+        if not digi_a.geometry.iloc[0].equals_exact(digi_b.geometry.iloc[0], 0):
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="underSeg 후보 탐색: 기존 반복 intersects vs STRtree 공간 조인")
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10, 20, 40])
+    parser.add_argument("--skip-bruteforce-above", type=int, default=20000, help="추론 폴리곤 수가 이보다 많으면 기존 방식 생략")
+    args = parser.parse_args()
+
+    print(f"{'pred':>7} {'digital':>8} {'cands':>6} {'bruteforce[s]':>14} {'strtree[s]':>11} {'speedup':>8} {'same':>5}")
+    for n_blocks in args.blocks:
+        polygon_gdf, digital_map = make_synthetic_city(n_blocks)
+
+        start = time.perf_counter()
+        fast = list(find_underseg_candidates(polygon_gdf, digital_map))
+        fast_time = time.perf_counter() - start
+
+        if len(polygon_gdf) > args.skip_bruteforce_above:
+            print(f"{len(polygon_gdf):>7} {len(digital_map):>8} {len(fast):>6} {'-':>14} {fast_time:>11.2f} {'-':>8} {'-':>5}")
+            continue
+
+        start = time.perf_counter()
+        slow = list(find_underseg_candidates_bruteforce(polygon_gdf, digital_map))
+        slow_time = time.perf_counter() - start
+
+        print(f"{len(polygon_gdf):>7} {len(digital_map):>8} {len(fast):>6} {slow_time:>14.2f} {fast_time:>11.2f} {slow_time / fast_time:>7.1f}x {str(same_candidates(slow, fast)):>5}")
+
+if __name__ == "__main__":
+    main()
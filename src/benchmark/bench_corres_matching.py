@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import shapely
+from shapely.geometry import box
+
+# src 폴더의 Extract_corres를 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, ".."))
+from Extract_corres import match_high_iou, match_high_iou_bruteforce
+
+# 합성 데이터: 격자 위 수치지도 건물, 추론 폴리곤은 건물을 조금 흔들고 키운 사각형 (일부 누락, 일부 두 채를 덮음, 순서는 섞음)
+def make_synthetic_pairs(n_buildings=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(n_buildings)))
+    reference, sam = [], []
+    for k in range(n_buildings):
+        x, y = (k % side) * 20.0, (k // side) * 20.0
+        w, h = rng.uniform(6, 14), rng.uniform(6, 14)
+        reference.append(box(x, y, x + w, y + h))
+
+        r = rng.random()
+        if r < 0.1:
+            continue  # 추론 누락
+        if r < 0.2:
+            sam.append(box(x - 1, y - 1, x + w + 10, y + h + 1))  # 옆 건물까지 덮는 underSeg
+            continue
+        dx, dy, grow = rng.normal(0, 0.6, 2).tolist() + [rng.uniform(0, 1.5)]
+        sam.append(box(x + dx - grow, y + dy - grow, x + w + dx + grow, y + h + dy + grow))
+    sam = np.asarray(sam, dtype=object)[rng.permutation(len(sam))]
+    return np.asarray(reference, dtype=object), sam
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract_corres 매칭: 기존 전체 쌍 calculate_iou vs STRtree + 면적 기반 IoU")
+    parser.add_argument("--buildings", type=int, nargs="+", default=[500, 2000, 20000])
+    parser.add_argument("--iou-threshold", type=float, default=0.8)
+    parser.add_argument("--skip-bruteforce-above", type=int, default=2000, help="건물 수가 이보다 많으면 기존 방식 생략")
+    args = parser.parse_args()
+
+    print(f"{'ref':>6} {'sam':>6} {'greedy':>7} {'1:1':>6} {'bruteforce[s]':>14} {'greedy[s]':>10} {'1:1[s]':>7} {'speedup':>8} {'same':>5}")
+    for n_buildings in args.buildings:
+        reference, sam = make_synthetic_pairs(n_buildings)
+
+        start = time.perf_counter()
+        greedy = match_high_iou(reference, sam, args.iou_threshold, "greedy")
+        greedy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        one_to_one = match_high_iou(reference, sam, args.iou_threshold, "one_to_one")
+        one_to_one_time = time.perf_counter() - start
+
+        row = f"{len(reference):>6} {len(sam):>6} {len(greedy[0]):>7} {len(one_to_one[0]):>6}"
+        if n_buildings > args.skip_bruteforce_above:
+            print(f"{row} {'-':>14} {greedy_time:>10.3f} {one_to_one_time:>7.3f} {'-':>8} {'-':>5}")
+            continue
+
+        start = time.perf_counter()
+        slow = match_high_iou_bruteforce(reference, sam, args.iou_threshold)
+        slow_time = time.perf_counter() - start
+
+        same = all(np.array_equal(a, b) for a, b in zip(slow, greedy))
+        print(f"{row} {slow_time:>14.2f} {greedy_time:>10.3f} {one_to_one_time:>7.3f} {slow_time / greedy_time:>7.0f}x {str(same):>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import tempfile
+import argparse
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from rasterio.transform import from_origin
+
+# preprocess 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "preprocess"))
+from crop_orthophoto_unionDigit import read_window
+
+# 지역 전체 정사영상 크기의 합성 모자이크 (strip 또는 타일 GTiff)
+def write_mosaic(path, width, height, tiled, block_size=256, seed=0):
+    profile = dict(driver="GTiff", width=width, height=height, count=3, dtype="uint8", crs="EPSG:5186", transform=from_origin(200000.0, 500000.0, 0.05, 0.05))
+    if tiled:
+        profile.update(tiled=True, blockxsize=block_size, blockysize=block_size)
+    rng = np.random.default_rng(seed)
+    with rasterio.open(path, "w", **profile) as dst:
+        for row in range(0, height, 512):
+            rows = min(512, height - row)
+            dst.write(rng.integers(0, 255, (3, rows, width), dtype=np.uint8), window=Window(0, row, width, rows))
+
+# from_bounds로 만든 것 같은 실수 윈도우 + 정수 윈도우 + 영상 경계에 걸치거나 밖에 있는 윈도우
+def make_windows(width, height, count, size=(300, 900), seed=0):
+    rng = np.random.default_rng(seed)
+    windows = []
+    for i in range(count):
+        w, h = rng.uniform(*size, 2)
+        col, row = rng.uniform(-w / 2, width - w / 2), rng.uniform(-h / 2, height - h / 2)
+        windows.append(Window(col, row, w, h) if i % 2 else Window(int(col), int(row), int(w), int(h)))
+    windows += [Window(width + 10.5, 5.0, 200.0, 200.0), Window(-400, -400, 300, 300)]
+    return windows
+
+def baseline_read(src, window):
+    return src.read(window=window)
+
+# crop 하나당 평균 시간 [s], 두 방식을 번갈아 repeat번 실행한 최솟값 (실행 순서에 따른 캐시 차이 제거)
+def time_reads(path, windows, reads, repeat):
+    best = [float("inf")] * len(reads)
+    for _ in range(repeat):
+        for i, read in enumerate(reads):
+            with rasterio.open(path) as src:
+                start = time.perf_counter()
+                for window in windows:
+                    read(src, window)
+                best[i] = min(best[i], (time.perf_counter() - start) / len(windows))
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="정사영상 crop 읽기: 기존 src.read(window) vs read_window (strip / 타일 모자이크)")
+    parser.add_argument("--width", type=int, default=12000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--crops", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--layouts", nargs="+", default=["striped", "tiled"], choices=["striped", "tiled"])
+    args = parser.parse_args()
+
+    windows = make_windows(args.width, args.height, args.crops)
+    mismatch = 0
+    print(f"{'layout':>8} {'block':>12} {'baseline[ms]':>13} {'read_window[ms]':>16} {'speedup':>8} {'equal':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in args.layouts:
+            path = os.path.join(tmp, f"{layout}.tif")
+            write_mosaic(path, args.width, args.height, tiled=layout == "tiled")
+            with rasterio.open(path) as src:
+                block = src.block_shapes[0]
+
+            baseline_time, read_time = time_reads(path, windows, [baseline_read, read_window], args.repeat)
+            with rasterio.open(path) as src:
+                equal = all(np.array_equal(baseline_read(src, window), read_window(src, window)) for window in windows)
+            mismatch += not equal
+            print(f"{layout:>8} {str(block):>12} {baseline_time * 1e3:>13.2f} {read_time * 1e3:>16.2f} {baseline_time / read_time:>7.2f}x {str(equal):>6}")
+
+    if mismatch:
+        print("❌ read_window 결과가 src.read(window)와 다릅니다.")
+        sys.exit(1)
+    print("✅ 모든 crop이 src.read(window)와 같습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+FastSAM everything 추론의 CPU 지연 시간과 마스크 일치도: PyTorch vs ONNX Runtime (intra-op 스레드 수별)
+- 지연 시간: 타일마다 repeats번 중 최소 시간 [ms]의 중앙값
+- 일치도 (PyTorch 결과 기준):
+  · everything 마스크 개수
+  · 마스크 IoU: PyTorch 마스크마다 가장 많이 겹치는 ONNX 마스크와의 IoU 평균
+  · 정제 마스크 IoU: 같은 프롬프트로 generate_fastsam_mask까지 실행한 최종 마스크의 IoU (후처리에 실제로 쓰이는 결과)
+정제 마스크 IoU가 하나라도 --min-iou보다 낮으면 종료 코드 1
+예) python bench_onnx_backend.py --model s --threads 1 2 4
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+import numpy as np
+import torch
+
+# applyModel 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "applyModel"))
+import diagnostics
+from apply_sam import create_fastsam_predictor, generate_fastsam_mask, everything_mask_stack
+from prompt_generator import createPoints
+from synthetic_data import make_scene
+
+def everything_latency(predictor, images, repeats):
+    times = []
+    for image in images:
+        best = np.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predictor(image)
+            best = min(best, time.perf_counter() - start)
+        times.append(best * 1000)
+    return float(np.median(times))
+
+# PyTorch 마스크마다 가장 많이 겹치는 ONNX 마스크와의 IoU 평균
+def matched_mask_iou(reference, other):
+    if reference is None or other is None:
+        return float(reference is None and other is None)
+    a = reference.reshape(len(reference), -1).float()
+    b = other.reshape(len(other), -1).float()
+    intersection = a @ b.T
+    union = a.sum(1)[:, None] + b.sum(1)[None, :] - intersection
+    return float((intersection / union.clamp(min=1)).max(dim=1).values.mean())
+
+def mask_iou(a, b):
+    a = np.zeros(1, dtype=bool) if a is None else a.astype(bool)
+    b = np.zeros(1, dtype=bool) if b is None else b.astype(bool)
+    union = np.count_nonzero(a | b)
+    return np.count_nonzero(a & b) / union if union > 0 else 1.0
+
+def main():
+    parser = argparse.ArgumentParser(description="FastSAM CPU 추론: PyTorch vs ONNX Runtime 지연 시간 / 마스크 일치도")
+    parser.add_argument("--model", default="FastSAM-x.pt", help="x / s 또는 applyModel 폴더 기준 모델 파일 (절대 경로 가능)")
+    parser.add_argument("--tiles", type=int, default=4)
+    parser.add_argument("--crop-size", type=int, default=1024)
+    parser.add_argument("--buildings", type=int, default=16)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4], help="ONNX Runtime intra-op 스레드 수")
+    parser.add_argument("--inter-op", type=int, default=1, help="ONNX Runtime inter-op 스레드 수")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--conf", type=float, default=0.2)
+    parser.add_argument("--min-iou", type=float, default=0.95, help="정제 마스크 IoU 하한")
+    args = parser.parse_args()
+
+    diagnostics.configure("off")
+    scenes = [make_scene(args.buildings, args.crop_size, seed=seed) for seed in range(args.tiles)]
+    tiles = [tile for tile, _, _ in scenes]
+    prompts = []
+    for tile, polygon_gdf, digital_gdf in scenes:
+        with contextlib.redirect_stdout(io.StringIO()):
+            positive_points, negative_points = createPoints(tile=tile, polygon_gdf=polygon_gdf, digital_gdf=digital_gdf)
+        prompts.append(([(p.x, p.y) for p in positive_points], [(p.x, p.y) for p in negative_points]))
+
+    torch_predictor = create_fastsam_predictor(args.model, conf=args.conf)
+    torch_predictor.args.device = "cpu"
+    torch_predictor.args.verbose = False
+    onnx_predictors = {}
+    for threads in args.threads:
+        onnx_predictors[threads] = create_fastsam_predictor(args.model, conf=args.conf, backend="onnx", intra_op_threads=threads, inter_op_threads=args.inter_op)
+        onnx_predictors[threads].args.verbose = False
+
+    images = [tile.image for tile in tiles]
+    for predictor in [torch_predictor, *onnx_predictors.values()]:
+        predictor(images[0])  # 모델 로드 및 워밍업
+
+    # 1. 지연 시간
+    print(f"\n{'backend':>24} {'ms/tile':>9} {'speedup':>8}")
+    reference_ms = everything_latency(torch_predictor, images, args.repeats)
+    print(f"{f'torch ({torch.get_num_threads()} threads)':>24} {reference_ms:>9.1f} {1.0:>8.2f}")
+    for threads, predictor in onnx_predictors.items():
+        ms = everything_latency(predictor, images, args.repeats)
+        print(f"{f'onnx (intra {threads}, inter {args.inter_op})':>24} {ms:>9.1f} {reference_ms / ms:>8.2f}")
+
+    # 2. 마스크 일치도 (스레드 수와 관계없이 같은 그래프이므로 첫 번째 ONNX 설정으로 비교)
+    onnx_predictor = next(iter(onnx_predictors.values()))
+    print(f"\n{'tile':>5} {'torch masks':>12} {'onnx masks':>11} {'mask IoU':>9} {'refined IoU':>12}")
+    refined = []
+    for k, (tile, (positive_coords, negative_coords)) in enumerate(zip(tiles, prompts)):
+        torch_masks = everything_mask_stack(torch_predictor(tile.image)[0])
+        onnx_masks = everything_mask_stack(onnx_predictor(tile.image)[0])
+        with contextlib.redirect_stdout(io.StringIO()):
+            torch_mask = generate_fastsam_mask(tile, positive_coords, negative_coords, torch_predictor)
+            onnx_mask = generate_fastsam_mask(tile, positive_coords, negative_coords, onnx_predictor)
+        refined.append(mask_iou(torch_mask, onnx_mask))
+        print(f"{k:>5} {0 if torch_masks is None else len(torch_masks):>12} {0 if onnx_masks is None else len(onnx_masks):>11} "
+              f"{matched_mask_iou(torch_masks, onnx_masks):>9.4f} {refined[-1]:>12.4f}")
+
+    if min(refined) < args.min_iou:
+        print(f"❌ 정제 마스크 IoU가 {args.min_iou}보다 낮은 타일이 있습니다 (최소 {min(refined):.4f})")
+        sys.exit(1)
+    print(f"✅ 모든 타일의 정제 마스크 IoU ≥ {args.min_iou} (최소 {min(refined):.4f})")
+
+if __name__ == "__main__":
+    main()
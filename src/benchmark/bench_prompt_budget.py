@@ -0,0 +1,88 @@
+"""
+프롬프트 개수 제한(PromptBudget)에 따른 정제 시간과 정제 폴리곤 IoU (합성 데이터, CPU)
+- 시간: createPoints(프롬프트 생성) / generate_fastsam_mask(everything 추론 + 마스크 선택), 장면마다 repeats번 중 최소 시간의 합
+- IoU: 제한 없이 만든 정제 폴리곤(합집합)과의 면적 IoU, 장면 중 최솟값
+기본은 stub 예측기 (everything 추론 시간은 budget과 무관), --model을 주면 실제 FastSAM 사용
+예) python bench_prompt_budget.py --budgets 2000 500 200 50 --scope component
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+import numpy as np
+import shapely
+
+# applyModel 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "applyModel"))
+import diagnostics
+from prompt_generator import createPoints
+from prompt_budget import PromptBudget
+from apply_sam import create_fastsam_predictor, generate_fastsam_mask
+from mask_to_vector import resize_mask_to_tif, mask_to_polygons
+from synthetic_data import make_scene
+from stub_predictor import StubFastSAMPredictor
+
+# 정제 한 번 → (프롬프트 생성 [ms], 마스크 생성 [ms], positive 수, negative 수, 정제 폴리곤 합집합)
+def refine(tile, polygon_gdf, digital_gdf, predictor, budget, repeats):
+    points_ms, mask_ms = np.inf, np.inf
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            positive_points, negative_points = createPoints(tile=tile, polygon_gdf=polygon_gdf, digital_gdf=digital_gdf, budget=budget)
+            points_ms = min(points_ms, (time.perf_counter() - start) * 1000)
+
+            positive_coords = [(point.x, point.y) for point in positive_points]
+            negative_coords = [(point.x, point.y) for point in negative_points]
+            start = time.perf_counter()
+            mask = generate_fastsam_mask(tile, positive_coords, negative_coords, predictor)
+            mask_ms = min(mask_ms, (time.perf_counter() - start) * 1000)
+
+    polygons = mask_to_polygons(resize_mask_to_tif(mask, tile), tile.transform) if mask is not None else None
+    refined = shapely.union_all(shapely.make_valid(np.asarray(polygons))) if polygons else shapely.Polygon()  # 구멍이 잘못 붙은 폴리곤 정리
+    return points_ms, mask_ms, len(positive_points), len(negative_points), refined
+
+def area_iou(a, b):
+    union = shapely.area(shapely.union(a, b))
+    return shapely.area(shapely.intersection(a, b)) / union if union > 0 else 1.0
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 개수 제한에 따른 정제 시간 vs 정제 폴리곤 IoU")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[2000, 1000, 500, 200, 100, 50], help="positive / negative 포인트 개수 제한")
+    parser.add_argument("--scope", choices=["tile", "component"], default="tile")
+    parser.add_argument("--scenes", type=int, default=3)
+    parser.add_argument("--buildings", type=int, default=4)
+    parser.add_argument("--crop-size", type=int, default=1024)
+    parser.add_argument("--gsd", type=float, default=0.25, help="픽셀 크기 [m] (클수록 건물이 크고 포인트가 많음)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--model", help="FastSAM 모델 (x / s / 파일), 없으면 stub 예측기")
+    args = parser.parse_args()
+
+    diagnostics.configure("off")
+    if args.model:
+        predictor = create_fastsam_predictor(args.model)
+        predictor.args.device = "cpu"
+        predictor.args.verbose = False
+    else:
+        predictor = StubFastSAMPredictor()
+    scenes = [make_scene(args.buildings, args.crop_size, args.gsd, seed) for seed in range(args.scenes)]
+
+    # 제한 없는 결과를 기준으로
+    print(f"{'budget':>7} {'positive':>9} {'negative':>9} {'points[ms]':>11} {'mask[ms]':>9} {'total[ms]':>10} {'speedup':>8} {'min IoU':>8} {'mean IoU':>9}")
+    reference = None
+    for budget in [None, *args.budgets]:
+        prompt_budget = None if budget is None else PromptBudget(positive=budget, negative=budget, scope=args.scope)
+        results = [refine(*scene, predictor, prompt_budget, args.repeats) for scene in scenes]
+        reference = reference or results
+        ious = [area_iou(result[4], base[4]) for result, base in zip(results, reference)]
+        points_ms, mask_ms, n_positive, n_negative = (sum(result[k] for result in results) for k in range(4))
+        total_ms = points_ms + mask_ms
+        reference_ms = sum(result[0] + result[1] for result in reference)
+        print(f"{'none' if budget is None else budget:>7} {n_positive:>9} {n_negative:>9} {points_ms:>11.1f} {mask_ms:>9.1f} {total_ms:>10.1f} "
+              f"{reference_ms / total_ms:>8.2f} {min(ious):>8.4f} {np.mean(ious):>9.4f}")
+
+if __name__ == "__main__":
+    main()
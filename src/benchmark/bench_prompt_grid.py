@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+import geopandas as gpd
+from shapely.geometry import box, Point
+from shapely.affinity import rotate
+from shapely.ops import unary_union
+from rasterio.coords import BoundingBox
+
+# applyModel 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "applyModel"))
+from prompt_generator import detect_shadow_points
+from grid_classifier import create_grid, grid_to_xy, classify_grid
+
+# ===== 기존 구현 (비교 기준, prompt_generator에서 옮겨옴) =====
+
+# 그림자 지역 감지 (영상 전체 마스크)
+def detect_shadow_regions(image, brightness_threshold=40, saturation_threshold=30, black_threshold=40):
+    image_hls = cv2.cvtColor(image, cv2.COLOR_BGR2HLS)
+    l_channel = image_hls[:, :, 1]  # Lightness 채널
+    s_channel = image_hls[:, :, 2]  # Saturation 채널
+
+    # 낮은 밝기와 채도 기준으로 그림자 감지
+    shadow_mask = np.zeros_like(l_channel, dtype=np.uint8)
+    shadow_mask[(l_channel < brightness_threshold) & (s_channel < saturation_threshold)] = 255
+
+    # 거의 검정색 영역 감지
+    black_regions = np.all(image <= black_threshold, axis=-1)
+    shadow_mask[black_regions] = 255
+    return shadow_mask
+
+def create_points(bounds, space=1.5):
+    # 일정 간격으로 포인트 생성
+    x_coords = np.arange(bounds.left, bounds.right, space)
+    y_coords = np.arange(bounds.bottom, bounds.top, space)
+    return [Point(x, y) for x in x_coords for y in y_coords]
+
+def classify_points_exclude_shadow(points_gdf, polygon_union, digital_union, shadow_points, min_distance, max_distance):
+    # 1. polygon_union과 digital_union을 합친 영역 속에 존재하는 포인트를 positive로 정의
+    combined_polygon = polygon_union.union(digital_union)
+    positive_points = list(points_gdf[points_gdf.geometry.within(combined_polygon)].geometry)  # polygon만 positive
+
+    # 2. shadow points는 positive에서 제외 (negative로 처리하지 않음)
+    shadow_points = set(shadow_points)
+    positive_points = [point for point in positive_points if (point.x, point.y) not in shadow_points]
+
+    # 3. 일정 거리 이하인 점들을 negative로 분류하고, 일정 거리 이상인 점들은 outside points로 분류
+    negative_points = []
+    for point in points_gdf.geometry:
+        if not point.within(combined_polygon) and combined_polygon.distance(point) >= max_distance:
+            continue  # 일정 거리 이상은 outside points
+        elif not point.within(combined_polygon) and min_distance <= combined_polygon.distance(point) < max_distance:
+            negative_points.append(point)  # min_distance 이상 max_distance 미만은 negative로 분류
+
+    # "outside points"는 positive와 negative 둘 다 포함하지 않는 점
+    outside_points = points_gdf[~points_gdf.geometry.isin(positive_points + negative_points)]
+    return positive_points, negative_points, outside_points
+
+# ===== 비교 =====
+
+# 합성 underSeg / 수치지도 폴리곤 생성 (회전된 건물 여러 개)
+def make_synthetic_polygons(n_buildings=6, size=60.0, seed=0):
+    rng = np.random.default_rng(seed)
+    buildings = []
+    for _ in range(n_buildings):
+        cx, cy = rng.uniform(size * 0.3, size * 0.7, 2)
+        w, h = rng.uniform(4, 12, 2)
+        buildings.append(rotate(box(cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2), rng.uniform(0, 90)))
+    polygon_union = unary_union(buildings[: n_buildings // 2]).convex_hull
+    digital_union = unary_union(buildings)
+    bounds = BoundingBox(0.0, 0.0, size, size)
+    return bounds, polygon_union, digital_union
+
+def run_legacy(bounds, polygon_union, digital_union, space, min_distance, max_distance):
+    points_gdf = gpd.GeoDataFrame(geometry=create_points(bounds, space))
+    positive, negative, _ = classify_points_exclude_shadow(points_gdf, polygon_union, digital_union, [], min_distance, max_distance)
+    return [(p.x, p.y) for p in positive], [(p.x, p.y) for p in negative]
+
+def run_grid(bounds, polygon_union, digital_union, space, min_distance, max_distance):
+    x_coords, y_coords = create_grid(bounds, space)
+    xs, ys = grid_to_xy(x_coords, y_coords)
+    positive_mask, negative_mask = classify_grid(x_coords, y_coords, polygon_union.union(digital_union), min_distance, max_distance, space)
+    return list(zip(xs[positive_mask], ys[positive_mask])), list(zip(xs[negative_mask], ys[negative_mask]))
+
+# 그림자 판단: 영상 전체 마스크에서 격자점 읽기(기존) vs 격자점 픽셀만 판단 (어둡거나 채도 낮은 영역이 섞인 합성 영상)
+def compare_shadow(size=2048, step=7, seed=0):
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+    image[rng.random((size, size)) < 0.2] //= 8
+    rows, cols = np.meshgrid(np.arange(-step, size + step, step), np.arange(-step, size + step, step), indexing="ij")
+    rows, cols = rows.ravel(), cols.ravel()
+
+    start = time.perf_counter()
+    mask = detect_shadow_regions(image)
+    valid = (rows >= 0) & (rows < size) & (cols >= 0) & (cols < size)
+    legacy = np.zeros(len(rows), dtype=bool)
+    legacy[valid] = mask[rows[valid], cols[valid]] > 0
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sampled = detect_shadow_points(image, rows, cols)
+    sampled_time = time.perf_counter() - start
+    return len(rows), legacy_time, sampled_time, bool(np.array_equal(legacy, sampled))
+
+def main(spaces=(4.0, 2.0, 1.0, 0.5), min_distance=3, max_distance=5):
+    bounds, polygon_union, digital_union = make_synthetic_polygons()
+
+    print(f"{'space':>6} {'points':>8} {'legacy[s]':>10} {'grid[s]':>9} {'speedup':>8} {'same':>5}")
+    for space in spaces:
+        start = time.perf_counter()
+        legacy = run_legacy(bounds, polygon_union, digital_union, space, min_distance, max_distance)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        grid = run_grid(bounds, polygon_union, digital_union, space, min_distance, max_distance)
+        grid_time = time.perf_counter() - start
+
+        n_points = len(create_grid(bounds, space)[0]) * len(create_grid(bounds, space)[1])
+        same = legacy == grid
+        print(f"{space:>6} {n_points:>8} {legacy_time:>10.3f} {grid_time:>9.3f} {legacy_time / grid_time:>8.1f} {str(same):>5}")
+
+    n_points, legacy_time, sampled_time, same = compare_shadow()
+    print(f"{'shadow':>6} {n_points:>8} {legacy_time:>10.3f} {sampled_time:>9.3f} {legacy_time / sampled_time:>8.1f} {str(same):>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+프롬프트 마스크 선택: 기존 방식(프롬프트마다 predictor.prompt) vs resolve_prompt_masks (한 번에 선택) 결과 비교 + 시간
+- 프롬프트마다 고른 마스크가 같은지 확인 (하나라도 다르면 종료 코드 1)
+- createPoints로 만든 프롬프트 외에 positive가 하나뿐인 타일(인접 positive 없음, negative 유무)도 확인
+예) python bench_prompt_resolution.py --scenes 5 --model s
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+import numpy as np
+
+# applyModel 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "applyModel"))
+import diagnostics
+from prompt_generator import createPoints
+from apply_sam import (create_fastsam_predictor, prompt_pixel_coords, nearest_positive_indices,
+                       everything_mask_stack, resolve_prompt_masks, scale_to_orig)
+from synthetic_data import make_scene
+from stub_predictor import StubFastSAMPredictor
+
+# 기존 방식 (기준 구현): 프롬프트마다 인접 positive + 모든 negative로 predictor.prompt를 불러 첫 번째 마스크 선택
+# 포인트가 하나도 없는 프롬프트는 predictor.prompt에 빈 목록을 줄 수 없으므로 points=None (모든 마스크)
+def reference_prompt_masks(predictor, everything_results, pos_point_coords, neighbours, neg_point_coords):
+    masks = []
+    for nearest_indices in neighbours:
+        nearest_pos_points = [pos_point_coords[i] for i in nearest_indices if i < len(pos_point_coords)]
+        points = nearest_pos_points + list(neg_point_coords)
+        labels = [1] * len(nearest_pos_points) + [0] * len(neg_point_coords)
+        results = predictor.prompt(everything_results, points=points or None, labels=labels or None)
+        if results and results[0].masks is not None and len(results[0].masks):
+            masks.append(scale_to_orig(results[0].masks.data, results[0].orig_shape)[0].cpu().numpy())
+        else:
+            masks.append(None)
+    return masks
+
+def resolved_masks(everything_result, pos_point_coords, neighbours, neg_point_coords):
+    stack = everything_mask_stack(everything_result)
+    indices = resolve_prompt_masks(stack, pos_point_coords, neighbours, neg_point_coords)
+    return [None if index < 0 else stack[index].cpu().numpy() for index in indices]
+
+def same_mask(a, b):
+    return (a is None and b is None) or (a is not None and b is not None and np.array_equal(a, b))
+
+# 타일 하나의 프롬프트 묶음들: (이름, positive 픽셀 좌표, negative 픽셀 좌표)
+def make_prompt_sets(tile, polygon_gdf, digital_gdf, rng):
+    with contextlib.redirect_stdout(io.StringIO()):
+        positive_points, negative_points = createPoints(tile=tile, polygon_gdf=polygon_gdf, digital_gdf=digital_gdf)
+    pos, neg = prompt_pixel_coords(tile, [(p.x, p.y) for p in positive_points], [(p.x, p.y) for p in negative_points])
+    pos, neg = [tuple(map(int, p)) for p in pos], [tuple(map(int, p)) for p in neg]
+    prompt_sets = [("createPoints", pos, neg)]
+
+    # positive가 하나뿐인 타일 (인접 positive 없음)
+    for k in range(min(3, len(pos))):
+        single = [pos[rng.integers(len(pos))]]
+        prompt_sets += [(f"single_pos{k}", single, []), (f"single_pos{k}+neg", single, neg[:3])]
+    return prompt_sets
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 마스크 선택: predictor.prompt 반복 vs resolve_prompt_masks (결과 비교, 시간)")
+    parser.add_argument("--scenes", type=int, default=3)
+    parser.add_argument("--buildings", type=int, default=8)
+    parser.add_argument("--crop-size", type=int, default=512)
+    parser.add_argument("--model", help="FastSAM 모델 (x / s / 파일), 없으면 stub 예측기")
+    args = parser.parse_args()
+
+    diagnostics.configure("off")
+    if args.model:
+        predictor = create_fastsam_predictor(args.model)
+        predictor.args.device = "cpu"
+        predictor.args.verbose = False
+    else:
+        predictor = StubFastSAMPredictor()
+
+    rng = np.random.default_rng(0)
+    mismatches = 0
+    print(f"{'scene':>5} {'prompts':>14} {'n':>5} {'masks':>6} {'prompt()[ms]':>13} {'resolve[ms]':>12} {'speedup':>8} {'same':>5}")
+    for seed in range(args.scenes):
+        tile, polygon_gdf, digital_gdf = make_scene(args.buildings, args.crop_size, seed=seed)
+        everything_results = predictor(tile.image)
+        n_masks = 0 if everything_results[0].masks is None else len(everything_results[0].masks)
+
+        for name, pos, neg in make_prompt_sets(tile, polygon_gdf, digital_gdf, rng):
+            neighbours = nearest_positive_indices(pos)
+
+            start = time.perf_counter()
+            reference = reference_prompt_masks(predictor, everything_results, pos, neighbours, neg)
+            reference_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            resolved = resolved_masks(everything_results[0], pos, neighbours, neg)
+            resolve_ms = (time.perf_counter() - start) * 1000
+
+            same = len(reference) == len(resolved) and all(same_mask(a, b) for a, b in zip(reference, resolved))
+            mismatches += not same
+            print(f"{seed:>5} {name:>14} {len(neighbours):>5} {n_masks:>6} {reference_ms:>13.2f} {resolve_ms:>12.2f} {reference_ms / max(resolve_ms, 1e-9):>7.1f}x {str(same):>5}")
+
+    if mismatches:
+        print(f"❌ 프롬프트 묶음 {mismatches}개에서 선택한 마스크가 predictor.prompt와 다릅니다.")
+        sys.exit(1)
+    print("✅ 모든 프롬프트에서 predictor.prompt와 같은 마스크를 선택했습니다.")
+
+if __name__ == "__main__":
+    main()
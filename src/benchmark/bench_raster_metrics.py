@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+import geopandas as gpd
+from affine import Affine
+from rasterio.features import rasterize
+from shapely.geometry import Polygon
+from shapely.geometry import box
+from shapely.affinity import rotate, translate, scale
+
+# verification 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "verification"))
+from metrics_engine import compute_indicators
+from raster_metrics import INDICATORS, area_error_bound
+
+# 마스크 윤곽선에서 만든 폴리곤처럼 계단 모양 꼭짓점이 많은 폴리곤으로 변환 (mask_to_polygons와 같은 방식)
+def to_contour_polygons(polygons, gsd=0.03):
+    minx, miny, maxx, maxy = gpd.GeoSeries(polygons).total_bounds
+    transform = Affine(gsd, 0, minx - 1, 0, -gsd, maxy + 1)
+    shape = (int((maxy - miny + 2) / gsd), int((maxx - minx + 2) / gsd))
+    result = []
+    for polygon in polygons:
+        mask = rasterize([(polygon, 1)], out_shape=shape, transform=transform, dtype=np.uint8)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            if len(contour) >= 4:
+                cols, rows = contour[:, 0, 0] + 0.5, contour[:, 0, 1] + 0.5
+                result.append(Polygon(np.column_stack(transform * (cols, rows))))
+    return result
+
+# 합성 검증 타일: GT 건물 여러 채 + 위치/크기/각도가 조금씩 어긋난 추론 폴리곤 (일부는 하나로 합쳐진 underSeg)
+# 추론 폴리곤은 실제 samPoly처럼 마스크 윤곽선에서 만든 계단 모양 폴리곤
+def make_synthetic_tiles(n_tiles=50, seed=0):
+    rng = np.random.default_rng(seed)
+    tiles = []
+    for _ in range(n_tiles):
+        gt = []
+        for k in range(rng.integers(2, 6)):
+            x, y = k * 14.0 + rng.uniform(0, 2), rng.uniform(0, 4)
+            gt.append(rotate(box(x, y, x + rng.uniform(6, 12), y + rng.uniform(6, 12)), rng.uniform(-10, 10)))
+        pred = [scale(translate(rotate(poly, rng.uniform(-3, 3)), *rng.normal(0, 0.4, 2)), *rng.uniform(0.9, 1.1, 2)) for poly in gt]
+        if rng.random() < 0.5:
+            pred = [gpd.GeoSeries(pred).union_all().convex_hull]
+        pred = to_contour_polygons(pred)
+        tiles.append((gpd.GeoDataFrame(geometry=gt, crs="EPSG:5186"), gpd.GeoDataFrame(geometry=pred, crs="EPSG:5186")))
+    return tiles
+
+def main():
+    parser = argparse.ArgumentParser(description="검증 지표: 정확한 벡터 계산 vs 래스터 격자 근사 (오차, 속도)")
+    parser.add_argument("--tiles", type=int, default=50)
+    parser.add_argument("--resolutions", type=float, nargs="+", default=[0.2, 0.1, 0.05, 0.025])
+    parser.add_argument("--boundary-buffer", type=float, default=2.0)
+    args = parser.parse_args()
+
+    tiles = make_synthetic_tiles(args.tiles)
+
+    start = time.perf_counter()
+    exact = [compute_indicators(gt, pred, args.boundary_buffer) for gt, pred in tiles]
+    vector_time = time.perf_counter() - start
+    print(f"vector: {vector_time / len(tiles) * 1000:.1f} ms/tile")
+
+    print(f"{'res[m]':>7} {'ms/tile':>8} {'speedup':>8} {'area bound[%]':>14} " + " ".join(f"{name[:12]:>12}" for name in INDICATORS))
+    for resolution in args.resolutions:
+        start = time.perf_counter()
+        approx = [compute_indicators(gt, pred, args.boundary_buffer, backend="raster", resolution=resolution) for gt, pred in tiles]
+        raster_time = time.perf_counter() - start
+
+        # 지표별 최대 절대 오차, 면적 오차 상한은 GT 면적 대비 비율의 최댓값
+        errors = {name: max(abs(a[name] - e[name]) for a, e in zip(approx, exact)) for name in INDICATORS}
+        bound = max(area_error_bound(gt.geometry, resolution) / gt.area.sum() for gt, _ in tiles) * 100
+        print(f"{resolution:>7.3f} {raster_time / len(tiles) * 1000:>8.1f} {vector_time / raster_time:>7.1f}x {bound:>14.2f} "
+              + " ".join(f"{errors[name]:>12.4f}" for name in INDICATORS))
+    print("(지표 열은 벡터 계산 대비 최대 절대 오차)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+합성 데이터 + stub FastSAM 예측기로 정제 / 검증 단계별 시간을 재는 벤치마크 모음 (오프라인, CPU)
+- 단계: createPoints, generate_fastsam_mask, mask_to_polygons, underSeg 후보 탐색,
+  검증 지표 (metrics_engine의 공유 교차 계산 + 지표별 함수, backend별 compute_indicators 전체, Pred는 마스크 윤곽선 폴리곤)
+- 건물 수 × crop 크기 조합마다 단계별 최소 / 중앙값 시간과 결과 개수를 JSON으로 저장 (--save)
+- 저장해 둔 기준 JSON과 비교하여 느려진 단계를 표시 (--compare, 하나라도 있으면 종료 코드 1, 결과 개수가 다르면 경고)
+예) python bench_suite.py --save baselines/main.json
+    python bench_suite.py --compare baselines/main.json --tolerance 1.3
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import contextlib
+import numpy as np
+import shapely
+import geopandas as gpd
+
+# applyModel / preprocess / verification 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+for folder in ("applyModel", "preprocess", "verification"):
+    sys.path.append(os.path.join(BASE_DIR, "..", folder))
+import diagnostics
+from prompt_generator import createPoints
+from apply_sam import generate_fastsam_mask
+from mask_to_vector import resize_mask_to_tif, mask_to_polygons
+from extract_underSeg_and_digital_Poly import find_underseg_candidates
+from metrics_engine import compute_overlay, overlap_ratios, iou_ratio, biou_ratio, precision_recall_f1, compute_indicators, BACKENDS
+from synthetic_data import make_scene
+from bench_raster_metrics import to_contour_polygons
+from stub_predictor import StubFastSAMPredictor
+
+STAGES = ("createPoints", "generate_fastsam_mask", "mask_to_polygons", "find_underseg_candidates",
+          "compute_overlay", "overlap_ratios", "iou_ratio", "biou_ratio", "precision_recall_f1",
+          *(f"indicators_{backend}" for backend in BACKENDS))
+
+# fn을 repeats번 실행하여 (최소, 중앙값) 시간 [ms]와 마지막 결과 반환, 단계 안의 print는 숨김
+def time_stage(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            times.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(times), 3), "median_ms": round(float(np.median(times)), 3)}, result
+
+def run_case(n_buildings, crop_size, predictor, repeats, seed=0):
+    tile, polygon_gdf, digital_gdf = make_scene(n_buildings, crop_size, seed=seed)
+    stages, counts = {}, {}
+
+    # 1. 프롬프트 생성
+    stages["createPoints"], (positive_points, negative_points) = time_stage(
+        lambda: createPoints(tile=tile, polygon_gdf=polygon_gdf, digital_gdf=digital_gdf), repeats)
+    positive_coords = [(point.x, point.y) for point in positive_points]
+    negative_coords = [(point.x, point.y) for point in negative_points]
+    counts.update(positive_points=len(positive_coords), negative_points=len(negative_coords))
+
+    # 2. 마스크 생성 (stub everything 추론 + 프롬프트별 마스크 선택)
+    stages["generate_fastsam_mask"], mask = time_stage(
+        lambda: generate_fastsam_mask(tile, positive_coords, negative_coords, predictor), repeats)
+    counts["mask_pixels"] = 0 if mask is None else int(np.count_nonzero(mask))
+
+    # 3. 마스크 → 폴리곤
+    resized_mask = resize_mask_to_tif(mask, tile) if mask is not None else np.zeros(tile.shape, dtype=np.uint8)
+    stages["mask_to_polygons"], polygons = time_stage(lambda: mask_to_polygons(resized_mask, tile.transform), repeats)
+    counts["polygons"] = len(polygons or [])
+
+    # 4. underSeg 후보 탐색
+    stages["find_underseg_candidates"], candidates = time_stage(
+        lambda: list(find_underseg_candidates(polygon_gdf, digital_gdf)), repeats)
+    counts["candidates"] = len(candidates)
+
+    # 5. 검증 지표 (수치지도 = GT, Pred = 추론 폴리곤을 영상 해상도의 마스크 윤곽선으로 바꾼 폴리곤, 실제 samPoly와 같은 계단 모양)
+    #    꼭짓점이 적은 사각형 그대로 재면 근사 backend가 항상 느리게 나옴 (metrics_engine 참고)
+    pred_gdf = gpd.GeoDataFrame(geometry=to_contour_polygons(list(polygon_gdf.geometry), gsd=tile.transform.a), crs=polygon_gdf.crs)
+    stages["compute_overlay"], overlay = time_stage(lambda: compute_overlay(digital_gdf, pred_gdf), repeats)
+    stages["overlap_ratios"], _ = time_stage(lambda: overlap_ratios(overlay, digital_gdf.area.sum(), pred_gdf.area.sum()), repeats)
+    stages["iou_ratio"], _ = time_stage(lambda: iou_ratio(overlay), repeats)
+    stages["biou_ratio"], _ = time_stage(lambda: biou_ratio(overlay), repeats)
+    stages["precision_recall_f1"], _ = time_stage(lambda: precision_recall_f1(overlay), repeats)
+
+    # 6. 검증 지표 전체 (verification_runner가 타일마다 부르는 compute_indicators, backend별 기본 해상도)
+    for backend in BACKENDS:
+        stages[f"indicators_{backend}"], _ = time_stage(lambda: compute_indicators(digital_gdf, pred_gdf, backend=backend), repeats)
+
+    return {"buildings": n_buildings, "crop_size": crop_size, "stages": stages, "counts": counts}
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "shapely": shapely.__version__,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+def print_table(cases):
+    print(f"{'buildings':>9} {'crop':>5} " + " ".join(f"{name[:16]:>16}" for name in STAGES) + "   (min ms)")
+    for case in cases:
+        print(f"{case['buildings']:>9} {case['crop_size']:>5} " + " ".join(f"{case['stages'][name]['min_ms']:>16.2f}" for name in STAGES))
+
+# 기준 JSON과 비교: 최소 시간이 tolerance배와 min_delta_ms를 모두 넘게 늘면 느려진 단계, 결과 개수가 다르면 경고
+def compare(cases, baseline, tolerance, min_delta_ms=1.0):
+    reference = {(case["buildings"], case["crop_size"]): case for case in baseline["cases"]}
+    regressions = []
+    print(f"\n{'buildings':>9} {'crop':>5} {'stage':>26} {'base[ms]':>9} {'now[ms]':>9} {'ratio':>6}")
+    for case in cases:
+        base = reference.get((case["buildings"], case["crop_size"]))
+        if base is None:
+            print(f"⚠️ 기준에 없는 조합입니다: buildings={case['buildings']}, crop={case['crop_size']}")
+            continue
+        if base["counts"] != case["counts"]:
+            print(f"⚠️ 결과 개수가 기준과 다릅니다 (buildings={case['buildings']}, crop={case['crop_size']}): {base['counts']} → {case['counts']}")
+        for name in STAGES:
+            if name not in base["stages"]:
+                continue
+            before, now = base["stages"][name]["min_ms"], case["stages"][name]["min_ms"]
+            ratio = now / before if before > 0 else 1.0
+            flag = " ← 느려짐" if ratio > tolerance and now - before > min_delta_ms else ""
+            print(f"{case['buildings']:>9} {case['crop_size']:>5} {name:>26} {before:>9.2f} {now:>9.2f} {ratio:>6.2f}{flag}")
+            if flag:
+                regressions.append((case["buildings"], case["crop_size"], name, ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 데이터 + stub FastSAM 단계별 벤치마크 (기준 JSON 저장 / 비교)")
+    parser.add_argument("--buildings", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--crop-sizes", type=int, nargs="+", default=[512, 1024])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--save", help="결과를 저장할 기준 JSON 경로")
+    parser.add_argument("--compare", help="비교할 기준 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="기준 대비 허용 배율 (최소 시간 기준)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="이보다 적게 늘어난 단계는 배율과 관계없이 통과 (짧은 단계의 측정 잡음)")
+    args = parser.parse_args()
+
+    diagnostics.configure("off")
+    predictor = StubFastSAMPredictor()
+
+    cases = [run_case(n_buildings, crop_size, predictor, args.repeats) for crop_size in args.crop_sizes for n_buildings in args.buildings]
+    print_table(cases)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment(), "repeats": args.repeats, "cases": cases}, file, indent=2, ensure_ascii=False)
+        print(f"✅ 기준 결과를 {args.save}에 저장했습니다.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(cases, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"❌ 느려진 단계 {len(regressions)}개 (허용 배율 {args.tolerance})")
+            sys.exit(1)
+        print("✅ 기준 대비 느려진 단계가 없습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+FastSAMPredictor 대신 쓰는 결정적(deterministic) everything 예측기 (FastSAM-x.pt 가중치 / GPU 불필요)
+- 입력 영상을 FastSAM과 같이 letterbox한 뒤, 밝기 구간별 연결 요소를 마스크로 반환
+- 결과는 ultralytics Results: masks는 letterbox 크기 (N, h, w), boxes는 원본 좌표 (N, 6)로 FastSAM 출력과 같은 형태
+- prompt()는 ultralytics FastSAMPredictor.prompt를 그대로 사용
+같은 영상이면 항상 같은 마스크를 만듦 (추론 시간 대신 후처리 단계의 시간을 재기 위한 용도)
+"""
+
+import cv2
+import numpy as np
+import torch
+from ultralytics.data.augment import LetterBox
+from ultralytics.engine.results import Results
+from ultralytics.models.fastsam import FastSAMPredictor
+
+class StubFastSAMPredictor:
+    def __init__(self, imgsz=640, min_area=30, levels=((0, 50), (50, 140), (140, 256))):
+        """
+        imgsz: letterbox 크기 (FastSAM 기본값 640)
+        levels: 마스크를 나눌 회색조 밝기 구간 [하한, 상한)
+        """
+        self.imgsz, self.min_area, self.levels = imgsz, min_area, levels
+        self._prompter = FastSAMPredictor(overrides={"save": False})
+        self._prompter.device = torch.device("cpu")
+
+    def _everything(self, image, auto):
+        letterboxed = LetterBox((self.imgsz, self.imgsz), auto=auto, stride=32)(image=image)
+        gray = cv2.cvtColor(letterboxed, cv2.COLOR_BGR2GRAY)
+        mask_height, mask_width = gray.shape
+        height, width = image.shape[:2]
+
+        masks, boxes = [], []
+        for low, high in self.levels:
+            n_labels, labels, stats, _ = cv2.connectedComponentsWithStats(((gray >= low) & (gray < high)).astype(np.uint8))
+            for label in range(1, n_labels):
+                x, y, w, h, area = stats[label]
+                if area < self.min_area:
+                    continue
+                masks.append(labels == label)
+                boxes.append([x * width / mask_width, y * height / mask_height,
+                              (x + w) * width / mask_width, (y + h) * height / mask_height, 0.9, 0])
+
+        if not masks:
+            return Results(image, "stub", {0: "object"}, boxes=torch.zeros((0, 6)))
+        return Results(image, "stub", {0: "object"},
+                       boxes=torch.tensor(boxes, dtype=torch.float32),
+                       masks=torch.from_numpy(np.stack(masks).astype(np.float32)))
+
+    def __call__(self, source):
+        images = source if isinstance(source, list) else [cv2.imread(source) if isinstance(source, str) else source]
+        # FastSAM과 같이 크기가 모두 같은 배치만 최소 여백(auto) letterbox
+        auto = len({image.shape for image in images}) == 1
+        return [self._everything(image, auto) for image in images]
+
+    def prompt(self, results, bboxes=None, points=None, labels=None, texts=None):
+        return self._prompter.prompt(results, bboxes=bboxes, points=points, labels=labels, texts=texts)
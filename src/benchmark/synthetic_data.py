@@ -0,0 +1,79 @@
+"""
+벤치마크용 합성 데이터 (실제 드론 영상 / 수치지도 없이 CPU에서 실행)
+- 정사영상 crop : 잡음 배경 + 밝은 지붕 + 지붕 아래쪽 그림자 (EPSG:5186, 기본 GSD 0.1 m)
+- 수치지도 폴리곤 : 지붕과 같은 위치의 (조금 회전된) 건물
+- 추론 폴리곤   : 이웃한 건물 1~3채를 하나로 덮은 폴리곤 (2채 이상이면 underSeg 후보), 위치 오차 포함
+같은 seed면 항상 같은 데이터를 만듦
+"""
+
+import os
+import sys
+import numpy as np
+import geopandas as gpd
+from shapely.geometry import box
+from shapely.affinity import rotate, translate
+from shapely.ops import unary_union
+from rasterio.features import rasterize
+from rasterio.transform import from_origin
+
+# applyModel 모듈을 불러오기 위해 경로 추가
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "applyModel"))
+from tile_context import tile_from_array
+
+CRS = "EPSG:5186"
+ORIGIN = (200000.0, 550000.0)  # crop 좌상단 좌표 [m]
+
+# 격자 칸마다 건물 한 채 (칸 크기의 35~60%, ±15° 회전)
+def make_buildings(n_buildings, size_m, rng):
+    columns = int(np.ceil(np.sqrt(n_buildings)))
+    cell = size_m / columns
+    buildings = []
+    for k in range(n_buildings):
+        cx = ORIGIN[0] + (k % columns + 0.5) * cell + rng.uniform(-0.1, 0.1) * cell
+        cy = ORIGIN[1] - (k // columns + 0.5) * cell + rng.uniform(-0.1, 0.1) * cell
+        w, h = rng.uniform(0.35, 0.6, 2) * cell
+        buildings.append(rotate(box(cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2), rng.uniform(-15, 15)))
+    return buildings
+
+# 같은 줄의 이웃 건물을 1~3채씩 묶어 하나의 추론 폴리곤으로 (묶음을 덮는 볼록 껍질 + 위치 오차)
+def make_inference_polygons(buildings, n_buildings, rng):
+    columns = int(np.ceil(np.sqrt(n_buildings)))
+    polygons = []
+    k = 0
+    while k < len(buildings):
+        n = min(int(rng.integers(1, 4)), columns - k % columns, len(buildings) - k)
+        group = unary_union(buildings[k:k + n]).convex_hull.buffer(0.3, join_style="mitre")
+        polygons.append(translate(group, *rng.normal(0, 0.3, 2)))
+        k += n
+    return polygons
+
+def render_orthophoto(buildings, crop_size, transform, rng):
+    bands = rng.integers(70, 130, (3, crop_size, crop_size), dtype=np.uint8)  # 잡음 배경
+
+    # 그림자(지붕을 남동쪽으로 민 자리) → 지붕 순서로 그림
+    shape = (crop_size, crop_size)
+    shadow = rasterize([(translate(b, 1.0, -1.5), 1) for b in buildings], out_shape=shape, transform=transform, dtype=np.uint8)
+    bands[:, shadow > 0] = 25
+    roofs = rasterize([(b, k + 1) for k, b in enumerate(buildings)], out_shape=shape, transform=transform, dtype=np.uint16)
+    colors = rng.integers(170, 250, (len(buildings) + 1, 3), dtype=np.uint8)
+    bands[:, roofs > 0] = colors[roofs[roofs > 0]].T
+    return bands
+
+def make_scene(n_buildings=8, crop_size=512, gsd=0.1, seed=0):
+    """
+    합성 crop 하나 → (TileContext, 추론 폴리곤 GeoDataFrame, 수치지도 폴리곤 GeoDataFrame)
+    crop_size: 영상 한 변의 픽셀 수 (영상 범위 = crop_size × gsd [m])
+    """
+    rng = np.random.default_rng(seed)
+    size_m = crop_size * gsd
+    transform = from_origin(ORIGIN[0], ORIGIN[1], gsd, gsd)
+
+    buildings = make_buildings(n_buildings, size_m, rng)
+    inference = make_inference_polygons(buildings, n_buildings, rng)
+    bands = render_orthophoto(buildings, crop_size, transform, rng)
+
+    tile = tile_from_array(bands, transform, CRS, f"synthetic_{n_buildings}b_{crop_size}px_{seed}")
+    polygon_gdf = gpd.GeoDataFrame({"cls": np.ones(len(inference), dtype=int)}, geometry=inference, crs=CRS)
+    digital_gdf = gpd.GeoDataFrame({"bid": np.arange(len(buildings))}, geometry=buildings, crs=CRS)
+    return tile, polygon_gdf, digital_gdf
@@ -9,23 +9,29 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 # 파일 경로 설정
 each_Poly_folder = os.path.normpath(os.path.join(DATA_DIR, "for_paper/sam_poly/sampoly2"))
 
-# samPoly* 패턴의 모든 Shapefile 찾기
-shapefiles = glob.glob(os.path.join(each_Poly_folder, "samPoly*.shp"))
-
-# Shapefile 병합
-gdfs = []
-for shp in shapefiles:
-    # GeoDataFrame 읽기
-    gdf = gpd.read_file(shp)
-    # 파일 이름을 새로운 컬럼 'source_file'에 추가
-    gdf['source_file'] = os.path.basename(shp)  # 파일 이름만 추출하여 추가
-    gdfs.append(gdf)
-
-# 병합
-merged_gdf = gpd.GeoDataFrame(pd.concat(gdfs, ignore_index=True))  # 병합
-
-# 결과 저장 (출력 파일 경로 설정)
-output_shapefile = os.path.join(each_Poly_folder, "merged_samPoly.shp")
-merged_gdf.to_file(output_shapefile)
-
-print(f"병합된 파일 저장 완료: {output_shapefile}")
+# process_main이 하나의 저장소(samPoly.gpkg / samPoly.parquet)에 기록했다면 병합할 필요 없음
+store_files = [path for path in (os.path.join(each_Poly_folder, "samPoly.gpkg"), os.path.join(each_Poly_folder, "samPoly.parquet")) if os.path.exists(path)]
+
+if store_files:
+    print(f"📌 이미 하나의 파일로 저장되어 있어 병합을 건너뜁니다: {store_files[0]} (tile_id 컬럼으로 타일 구분)")
+else:
+    # samPoly* 패턴의 모든 Shapefile 찾기
+    shapefiles = glob.glob(os.path.join(each_Poly_folder, "samPoly*.shp"))
+
+    # Shapefile 병합
+    gdfs = []
+    for shp in shapefiles:
+        # GeoDataFrame 읽기
+        gdf = gpd.read_file(shp)
+        # 파일 이름을 새로운 컬럼 'source_file'에 추가
+        gdf['source_file'] = os.path.basename(shp)  # 파일 이름만 추출하여 추가
+        gdfs.append(gdf)
+
+    # 병합
+    merged_gdf = gpd.GeoDataFrame(pd.concat(gdfs, ignore_index=True))  # 병합
+
+    # 결과 저장 (출력 파일 경로 설정)
+    output_shapefile = os.path.join(each_Poly_folder, "merged_samPoly.shp")
+    merged_gdf.to_file(output_shapefile)
+
+    print(f"병합된 파일 저장 완료: {output_shapefile}")
@@ -2,8 +2,9 @@ import rasterio
 import geopandas as gpd
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from rasterio.windows import from_bounds
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from rasterio.windows import Window, from_bounds
 import os
 
 # 폴리곤 파일들이 저장된 폴더 경로
@@ -15,71 +16,162 @@ digitalMap_folder = os.path.normpath(os.path.join(DATA_DIR, "Each digitalMap Fol
 orthophoto_path = os.path.normpath(os.path.join(DATA_DIR, "Some_Region_Drone_Image.tif"))
 output_folder = os.path.normpath(os.path.join(DATA_DIR, "Each OrthoPhoto Output_Folder_Path"))
 
-# 폴더 내 모든 Shapefile 파일을 처리
-for polygon_file in os.listdir(polygon_folder):
-    if polygon_file.endswith(".shp"):
-        polygon_file_path = os.path.join(polygon_folder, polygon_file)
-        
-        # 폴리곤 파일 불러오기
-        polygons = gpd.read_file(polygon_file_path)
-
-        # 대응되는 디지털 폴리곤 파일 불러오기
-        digital_file_path = os.path.join(digitalMap_folder, f"digitalPoly{polygon_file.replace('underSegPoly', '').replace('.shp', '')}.shp")
-        
-        if os.path.exists(digital_file_path):
-            digital_polygons = gpd.read_file(digital_file_path)
-            # 두 GeoDataFrame 결합 (합집합 영역 계산)
-            polygons = gpd.GeoDataFrame(pd.concat([polygons, digital_polygons], ignore_index=True))
-
-        with rasterio.open(orthophoto_path) as src:
-            crs = src.crs  # 좌표계 확인
-            print(f"📌 좌표계 정보: {src.crs}")
-            transform = src.transform  # 변환 행렬
-            
-            if polygons.crs != crs:
-                print(f"📌 좌표계 정보: {polygons.crs}")
-                print("좌표계 정보가 다릅니다.")
-            
-            # === 1. 두 폴리곤의 합집합 영역 계산 ===
-            union_geometry = polygons.geometry.unary_union  # 합집합 영역
-
-            # === 2. 합집합 영역의 최소 BBox 계산 ===
-            minx, miny, maxx, maxy = union_geometry.bounds  # 합집합 영역의 BBox
-
-            # === 3. 여유 공간(Margin) 추가 ===
-            margin_ratio = 0.6  # 전체 크기의 40% 여유 공간 추가
-            margin_x = (maxx - minx) * margin_ratio
-            margin_y = (maxy - miny) * margin_ratio
-
-            minx -= margin_x
-            maxx += margin_x
-            miny -= margin_y
-            maxy += margin_y
-
-            # === 4. 정사영상에서 BBox 영역만 추출 ===
-            window = from_bounds(minx, miny, maxx, maxy, transform)
-            cropped_image = src.read(window=window)
-
-            # === 5. 변환 행렬 업데이트 (BBox 기반) ===
-            cropped_transform = src.window_transform(window)
-
-        # === 6. 새로운 TIFF 파일로 저장 ===
-        output_filename = polygon_file.replace("underSegPoly", "underSegOrtho").replace(".shp", ".tif")
-        output_path = os.path.join(output_folder, output_filename)
-
-        os.makedirs(output_folder, exist_ok=True)
-
-        with rasterio.open(
-            output_path,
-            "w",
-            driver="GTiff",
-            height=cropped_image.shape[1],
-            width=cropped_image.shape[2],
-            count=cropped_image.shape[0],  # 채널 수
-            dtype=cropped_image.dtype,
-            crs=src.crs,
-            transform=cropped_transform,
-        ) as dst:
-            dst.write(cropped_image)
-
-        print(f"✅ '{polygon_file}'와 대응되는 '{digital_file_path}'을(를) 병합하여 생성된 정사영상이 '{output_path}'에 저장되었습니다.")
+# 미리 설정된 출력 옵션 (None이면 기존과 같은 비압축 strip GTiff)
+COMPRESS_OPTIONS = {
+    None: {},
+    "deflate": {"compress": "deflate", "predictor": 2, "zlevel": 6},
+    "lzw": {"compress": "lzw", "predictor": 2},
+    "zstd": {"compress": "zstd", "predictor": 2},
+}
+
+class OrthophotoReader:
+    """
+    워커 스레드마다 정사영상 핸들을 하나씩만 열어 재사용 (rasterio 핸들은 스레드 간 공유 불가)
+    """
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+
+    def dataset(self):
+        src = getattr(self._local, "src", None)
+        if src is None:
+            src = rasterio.open(self.path)
+            self._local.src = src
+            with self._lock:
+                self._handles.append(src)
+        return src
+
+    def close(self):
+        with self._lock:
+            for src in self._handles:
+                src.close()
+            self._handles.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+ALIGN_MAX_RATIO = 2.0  # 블록 정렬 범위가 요청 범위의 이 배수 이하일 때만 정렬 읽기
+
+# 윈도우를 감싸는 원본 내부 블록 단위 정수 윈도우 (영상 범위로 클리핑)
+def block_aligned_window(window, block_shape, width, height):
+    block_h, block_w = block_shape
+    col0 = max(0, int(np.floor(window.col_off)) // block_w * block_w)
+    row0 = max(0, int(np.floor(window.row_off)) // block_h * block_h)
+    col1 = min(width, -(-int(np.ceil(window.col_off + window.width)) // block_w) * block_w)
+    row1 = min(height, -(-int(np.ceil(window.row_off + window.height)) // block_h) * block_h)
+    return Window(col0, row0, col1 - col0, row1 - row0)
+
+def _is_integral(window):
+    return all(float(value).is_integer() for value in (window.col_off, window.row_off, window.width, window.height))
+
+# src.read(window=window)와 같은 결과 (영상 밖 부분은 잘라내고, 영상과 겹치지 않으면 빈 배열)
+# 타일 원본의 정수 윈도우이고 블록 정렬 범위가 작을 때만 블록 단위로 읽어 잘라냄, 그 외에는 그대로 읽음
+# (strip 원본은 블록 하나가 영상 너비 전체이므로 정렬하면 오히려 많이 읽음)
+def read_window(src, window):
+    col0, row0 = max(window.col_off, 0), max(window.row_off, 0)
+    col1, row1 = min(window.col_off + window.width, src.width), min(window.row_off + window.height, src.height)
+    block_shape = src.block_shapes[0]
+    if col1 > col0 and row1 > row0 and block_shape[1] < src.width and _is_integral(window):
+        aligned = block_aligned_window(window, block_shape, src.width, src.height)
+        if aligned.width * aligned.height <= ALIGN_MAX_RATIO * (col1 - col0) * (row1 - row0):
+            blocks = src.read(window=aligned)
+            return blocks[:, int(row0 - aligned.row_off):int(row1 - aligned.row_off), int(col0 - aligned.col_off):int(col1 - aligned.col_off)]
+    return src.read(window=window)
+
+# 후보 폴리곤과 대응 수치지도 폴리곤의 합집합 BBox에 여유 공간을 더한 범위
+def crop_bounds(polygon_file_path, digital_file_path, margin_ratio=0.6):
+    # 폴리곤 파일 불러오기
+    polygons = gpd.read_file(polygon_file_path)
+
+    # 대응되는 디지털 폴리곤 파일 불러오기
+    if os.path.exists(digital_file_path):
+        digital_polygons = gpd.read_file(digital_file_path)
+        # 두 GeoDataFrame 결합 (합집합 영역 계산)
+        polygons = gpd.GeoDataFrame(pd.concat([polygons, digital_polygons], ignore_index=True))
+
+    return union_crop_bounds(polygons, margin_ratio), polygons.crs
+
+# 메모리에 있는 폴리곤들(추론 + 수치지도)의 합집합 BBox + 여유 공간
+def union_crop_bounds(polygons, margin_ratio=0.6):
+    # === 1. 두 폴리곤의 합집합 영역 계산 ===
+    union_geometry = polygons.geometry.unary_union  # 합집합 영역
+
+    # === 2. 합집합 영역의 최소 BBox 계산 ===
+    minx, miny, maxx, maxy = union_geometry.bounds  # 합집합 영역의 BBox
+
+    # === 3. 여유 공간(Margin) 추가 ===
+    margin_x = (maxx - minx) * margin_ratio
+    margin_y = (maxy - miny) * margin_ratio
+
+    return minx - margin_x, miny - margin_y, maxx + margin_x, maxy + margin_y
+
+def write_crop(output_path, cropped_image, cropped_transform, crs, tiled=False, compress=None, block_size=256):
+    profile = {
+        "driver": "GTiff",
+        "height": cropped_image.shape[1],
+        "width": cropped_image.shape[2],
+        "count": cropped_image.shape[0],  # 채널 수
+        "dtype": cropped_image.dtype,
+        "crs": crs,
+        "transform": cropped_transform,
+    }
+    if tiled:
+        profile.update(tiled=True, blockxsize=block_size, blockysize=block_size)
+    profile.update(COMPRESS_OPTIONS[compress])
+
+    with rasterio.open(output_path, "w", **profile) as dst:
+        dst.write(cropped_image)
+
+def crop_one(reader, polygon_file, polygon_folder, digitalMap_folder, output_folder, margin_ratio=0.6, tiled=False, compress=None):
+    polygon_file_path = os.path.join(polygon_folder, polygon_file)
+    digital_file_path = os.path.join(digitalMap_folder, f"digitalPoly{polygon_file.replace('underSegPoly', '').replace('.shp', '')}.shp")
+
+    (minx, miny, maxx, maxy), polygon_crs = crop_bounds(polygon_file_path, digital_file_path, margin_ratio)
+
+    src = reader.dataset()
+    if polygon_crs != src.crs:
+        print(f"📌 좌표계 정보: {polygon_crs}")
+        print("좌표계 정보가 다릅니다.")
+
+    # === 4. 정사영상에서 BBox 영역만 추출 ===
+    window = from_bounds(minx, miny, maxx, maxy, src.transform)
+    cropped_image = read_window(src, window)
+
+    # === 5. 변환 행렬 업데이트 (BBox 기반) ===
+    cropped_transform = src.window_transform(window)
+
+    # === 6. 새로운 TIFF 파일로 저장 ===
+    output_filename = polygon_file.replace("underSegPoly", "underSegOrtho").replace(".shp", ".tif")
+    output_path = os.path.join(output_folder, output_filename)
+    write_crop(output_path, cropped_image, cropped_transform, src.crs, tiled, compress)
+
+    print(f"✅ '{polygon_file}'와 대응되는 '{digital_file_path}'을(를) 병합하여 생성된 정사영상이 '{output_path}'에 저장되었습니다.")
+    return output_path
+
+def crop_candidates(polygon_folder, digitalMap_folder, orthophoto_path, output_folder, margin_ratio=0.6, workers=4, tiled=False, compress=None):
+    """
+    폴더 내 모든 후보 Shapefile에 대해 정사영상을 잘라 저장
+    workers: 읽기/쓰기를 겹쳐 실행할 스레드 수 (스레드마다 정사영상 핸들 1개)
+    tiled, compress: 출력 GTiff 옵션 (기본값은 기존과 같은 비압축 strip)
+    """
+    if compress not in COMPRESS_OPTIONS:
+        raise ValueError(f"Unknown compress option: {compress} (choose from {list(COMPRESS_OPTIONS)})")
+
+    polygon_files = sorted(f for f in os.listdir(polygon_folder) if f.endswith(".shp"))
+    os.makedirs(output_folder, exist_ok=True)
+
+    with OrthophotoReader(orthophoto_path) as reader:
+        print(f"📌 좌표계 정보: {reader.dataset().crs}")
+        args = (polygon_folder, digitalMap_folder, output_folder, margin_ratio, tiled, compress)
+        if workers <= 1:
+            return [crop_one(reader, polygon_file, *args) for polygon_file in polygon_files]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda polygon_file: crop_one(reader, polygon_file, *args), polygon_files))
+
+if __name__ == "__main__":
+    crop_candidates(polygon_folder, digitalMap_folder, orthophoto_path, output_folder)
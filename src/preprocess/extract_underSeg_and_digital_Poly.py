@@ -1,3 +1,5 @@
+import numpy as np
+import shapely
 import geopandas as gpd
 import os
 
@@ -11,44 +13,85 @@ digital_file = os.path.normpath(os.path.join(DATA_DIR, "All digitalMap Folder/di
 output_underSegPoly_folder = os.path.normpath(os.path.join(DATA_DIR, "Output each underseg Polygon Folder"))
 output_digitPoly_folder = os.path.normpath(os.path.join(DATA_DIR, "Output each digital Polygon Folder"))
 
-# 저장할 폴더 생성
-os.makedirs(output_underSegPoly_folder, exist_ok=True)
-os.makedirs(output_digitPoly_folder, exist_ok=True)
-
-# 데이터 로드
-polygon_gdf = gpd.read_file(polygon_file)  # 모든 추론된 폴리곤이 포함된 파일
-digital_map = gpd.read_file(digital_file)  # 수치지도 데이터
-
-# 좌표계 변환 (필요하면)
-if polygon_gdf.crs != digital_map.crs:
-    print("좌표계가 달라")
-    digital_map = digital_map.to_crs(polygon_gdf.crs)
-
-# 개별 폴리곤 처리
-count = 0  # 파일명 번호 관리
-for idx, pred_poly in polygon_gdf.iterrows():
-    # 현재 추론된 폴리곤과 겹치는 수치지도 폴리곤 찾기
-    overlapping = digital_map[digital_map.intersects(pred_poly.geometry)]
-
-    # 2개 이상 겹칠 경우만 저장
-    if len(overlapping) >= 2:
-        underSegPoly_save_path = os.path.join(output_underSegPoly_folder, f"underSegPoly{count}.shp")
-        gpd.GeoDataFrame([pred_poly], crs=polygon_gdf.crs).to_file(underSegPoly_save_path)
+# 데이터 로드 및 좌표계 맞추기
+def load_inputs(polygon_file, digital_file):
+    polygon_gdf = gpd.read_file(polygon_file)  # 모든 추론된 폴리곤이 포함된 파일
+    digital_map = gpd.read_file(digital_file)  # 수치지도 데이터
+
+    # 좌표계 변환 (필요하면)
+    if polygon_gdf.crs != digital_map.crs:
+        print("좌표계가 달라")
+        digital_map = digital_map.to_crs(polygon_gdf.crs)
+    return polygon_gdf, digital_map
+
+def find_underseg_candidates(polygon_gdf, digital_map, min_overlaps=2):
+    """
+    2개 이상의 수치지도 폴리곤과 겹치는 추론 폴리곤(underSeg 후보)을 순서대로 반환
+    (count, 추론 폴리곤 GeoDataFrame, 병합된 수치지도 폴리곤 GeoDataFrame), count는 파일명 번호와 동일
+    수치지도 STRtree로 겹치는 쌍을 한 번에 찾고, 후보별 병합도 겹침 개수가 같은 후보끼리 묶어 한 번에 계산
+    """
+    # 1. (추론 폴리곤, 수치지도 폴리곤) 겹침 쌍을 공간 인덱스로 한 번에 탐색
+    pred_idx, digit_idx = digital_map.sindex.query(polygon_gdf.geometry.values, predicate="intersects")
+    order = np.lexsort((digit_idx, pred_idx))  # 추론 폴리곤 순서, 그 안에서는 수치지도 순서 (기존 boolean 인덱싱과 동일)
+    pred_idx, digit_idx = pred_idx[order], digit_idx[order]
+
+    # 2. 겹침 개수가 min_overlaps 이상인 추론 폴리곤만 후보
+    counts = np.bincount(pred_idx, minlength=len(polygon_gdf))
+    candidates = np.flatnonzero(counts >= min_overlaps)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    # 3. 후보별 수치지도 합집합 (겹침 개수별로 (후보 수, 개수) 배열을 만들어 행 단위 union_all)
+    digital_geoms = np.asarray(digital_map.geometry.values)
+    merged = np.empty(len(candidates), dtype=object)
+    for n_overlaps in np.unique(counts[candidates]):
+        group = np.flatnonzero(counts[candidates] == n_overlaps)
+        members = digit_idx[starts[candidates[group]][:, np.newaxis] + np.arange(n_overlaps)]
+        merged[group] = shapely.union_all(digital_geoms[members], axis=1)
+
+    # 4. 후보별 1행 GeoDataFrame은 전체 테이블에서 잘라 사용 (행마다 새로 만드는 것보다 빠름)
+    merged_gdf = gpd.GeoDataFrame({"geometry": merged}, crs=digital_map.crs)
+    for count, i in enumerate(candidates):
+        yield count, polygon_gdf.iloc[[i]], merged_gdf.iloc[[count]].reset_index(drop=True)
+
+# 기존 방식 (추론 폴리곤마다 수치지도 전체와 intersects, 비교/검증용)
+def find_underseg_candidates_bruteforce(polygon_gdf, digital_map):
+    count = 0  # 파일명 번호 관리
+    for idx, pred_poly in polygon_gdf.iterrows():
+        # 현재 추론된 폴리곤과 겹치는 수치지도 폴리곤 찾기
+        overlapping = digital_map[digital_map.intersects(pred_poly.geometry)]
+
+        # 2개 이상 겹칠 경우만 저장
+        if len(overlapping) >= 2:
+            merged_digi_poly = overlapping.unary_union  # 겹치는 수치지도 폴리곤들을 병합
+            yield (count,
+                   gpd.GeoDataFrame([pred_poly], crs=polygon_gdf.crs),
+                   gpd.GeoDataFrame([{"geometry": merged_digi_poly}], crs=digital_map.crs))
+            count += 1  # 파일명 증가
+
+def save_candidates(polygon_gdf, digital_map, output_underSegPoly_folder, output_digitPoly_folder):
+    # 저장할 폴더 생성
+    os.makedirs(output_underSegPoly_folder, exist_ok=True)
+    os.makedirs(output_digitPoly_folder, exist_ok=True)
+
+    count = 0
+    for candidate_id, underSeg_gdf, merged_digi_gdf in find_underseg_candidates(polygon_gdf, digital_map):
+        underSegPoly_save_path = os.path.join(output_underSegPoly_folder, f"underSegPoly{candidate_id}.shp")
+        underSeg_gdf.to_file(underSegPoly_save_path)
         print(f"✅ 저장 완료: {underSegPoly_save_path}")
 
-        merged_digi_poly = overlapping.unary_union  # 겹치는 수치지도 폴리곤들을 병합
-        merged_digi_gdf = gpd.GeoDataFrame([{"geometry": merged_digi_poly}], crs=digital_map.crs)
-        
         # 병합된 수치지도 폴리곤 저장
-        digitPoly_save_path = os.path.join(output_digitPoly_folder, f"digitalPoly{count}.shp")
+        digitPoly_save_path = os.path.join(output_digitPoly_folder, f"digitalPoly{candidate_id}.shp")
         merged_digi_gdf.to_file(digitPoly_save_path)
         print(f"✅ 저장 완료: {digitPoly_save_path}")
+        count += 1  # 저장된 후보 수
 
-        count += 1  # 파일명 증가
-
+    # 저장된 폴리곤 개수 출력
+    if count > 0:
+        print(f"✅ 총 {count}개의 UnderSeg, digital 폴리곤이 저장되었습니다.")
+    else:
+        print("⚠️ 2개 이상 겹치는 폴리곤이 없습니다.")
+    return count
 
-# 저장된 폴리곤 개수 출력
-if count > 0:
-    print(f"✅ 총 {count}개의 UnderSeg, digital 폴리곤이 저장되었습니다.")
-else:
-    print("⚠️ 2개 이상 겹치는 폴리곤이 없습니다.")
+if __name__ == "__main__":
+    polygon_gdf, digital_map = load_inputs(polygon_file, digital_file)
+    save_candidates(polygon_gdf, digital_map, output_underSegPoly_folder, output_digitPoly_folder)
@@ -0,0 +1,94 @@
+"""
+경계 지표를 경계선 표본점 + cKDTree 거리 질의로 계산 (폴리곤 경계 버퍼의 합집합/교차 연산 없이)
+- 경계선(외곽 + 구멍)을 꼭짓점 + spacing [m] 이하 간격의 점으로 나눔, 각 점은 자신이 대표하는 경계 길이를 가중치로 가짐
+- Boundary precision / recall : 추론(GT) 경계 길이 중 tolerance 이내에 GT(추론) 경계가 있는 비율, F-score는 조화 평균
+- BIoU : 경계에서 boundary_buffer 이내 영역(= poly.boundary.buffer의 합집합)을 cell [m] 격자 칸마다 점 하나로 세어 교집합 / 합집합
+  격자점은 경계 표본점 근처 블록에서만 만들고, 각 격자점이 GT / 추론 경계 buffer 안인지는 cKDTree 최근접 거리로 판정
+오차: 격자 면적 오차는 cell에 비례, 표본점 거리는 선까지의 거리보다 최대 spacing² / (8 × boundary_buffer) 정도 큼
+"""
+
+import numpy as np
+import shapely
+from scipy.spatial import cKDTree
+
+BOUNDARY_INDICATORS = ("biou_ratio", "boundary_precision", "boundary_recall", "boundary_f1")
+
+# 경계선을 spacing 이하 간격의 표본점으로 변환 → (점 좌표 (N, 2), 점마다 대표하는 경계 길이 (N,))
+def sample_boundaries(geoms, spacing=0.2):
+    parts = shapely.get_parts(np.asarray(geoms))
+    parts = parts[~shapely.is_empty(parts)]
+    rings = shapely.get_rings(parts)  # 외곽선 + 구멍
+    if len(rings) == 0:
+        return np.empty((0, 2)), np.empty(0)
+
+    # 꼭짓점(모서리)은 모두 표본에 포함하고, spacing보다 긴 구간만 나눔
+    coords, ring_index = shapely.get_coordinates(shapely.segmentize(rings, spacing), return_index=True)
+    segments = np.linalg.norm(np.diff(coords, axis=0), axis=1)
+    segments[ring_index[1:] != ring_index[:-1]] = 0  # 서로 다른 고리 사이는 구간이 아님
+
+    # 점마다 양옆 구간 길이의 절반 (닫는 점은 시작점과 같은 위치, 둘이 합쳐 한 점 몫)
+    weights = np.concatenate([segments, [0]]) / 2 + np.concatenate([[0], segments]) / 2
+    return coords, weights
+
+# 표본점 근처 블록(한 변 ≈ boundary_buffer / 2)의 격자점 (cell 간격, 칸마다 칸 안의 임의 위치 하나)
+# 칸 중심 대신 칸 안에서 흔든 점을 사용하여 축에 나란한 경계에서 격자 한 줄이 통째로 들어가거나 빠지는 오차를 없앰 (seed 고정)
+def band_lattice(points, boundary_buffer, cell, seed=0):
+    per_block = max(1, int(np.ceil(boundary_buffer / 2 / cell)))
+    block = per_block * cell
+    reach = int(np.ceil(boundary_buffer / block))
+    origin = points.min(axis=0) - (reach + 1) * block
+
+    # buffer 이내의 격자점은 표본점 블록에서 reach개 블록 이내에만 있음
+    # 블록 (열, 행)을 정수 하나로 묶어 중복 제거 (열 간격 = 이웃까지 포함한 행 범위, origin 때문에 행은 1 이상)
+    cols, rows = np.floor((points - origin) / block).astype(np.int64).T
+    height = rows.max() + reach + 2
+    blocks = np.unique(cols * height + rows)
+    neighbors = np.array([dx * height + dy for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1)])
+    blocks = np.unique((blocks[:, np.newaxis] + neighbors).ravel())
+    blocks = np.column_stack([blocks // height, blocks % height])
+
+    offsets = np.stack(np.meshgrid(np.arange(per_block), np.arange(per_block)), axis=-1).reshape(-1, 2) * cell
+    lattice = (origin + blocks[:, np.newaxis, :] * block + offsets).reshape(-1, 2)
+    return lattice + np.random.default_rng(seed).uniform(0, cell, lattice.shape)
+
+def _within(tree, points, distance, workers):
+    if tree is None:
+        return np.zeros(len(points), dtype=bool)
+    nearest, _ = tree.query(points, k=1, distance_upper_bound=distance, workers=workers)
+    return nearest <= distance
+
+def compute_boundary_metrics(gt_gdf, pred_gdf, boundary_buffer=2.0, tolerance=None, spacing=0.2, cell=0.2, workers=-1):
+    """
+    boundary_buffer: BIoU 경계 buffer 거리 [m] (metrics_engine.biou_ratio와 같은 의미)
+    tolerance: boundary precision / recall의 허용 거리 [m] (None이면 boundary_buffer)
+    workers: cKDTree 질의 스레드 수 (-1이면 모든 코어)
+    """
+    if tolerance is None:
+        tolerance = boundary_buffer
+    gt_points, gt_weights = sample_boundaries(gt_gdf.geometry.values, spacing)
+    pred_points, pred_weights = sample_boundaries(pred_gdf.geometry.values, spacing)
+    gt_tree = cKDTree(gt_points) if len(gt_points) else None
+    pred_tree = cKDTree(pred_points) if len(pred_points) else None
+
+    # 1. Boundary precision / recall / F-score (경계 길이 가중)
+    pred_matched = _within(gt_tree, pred_points, tolerance, workers)
+    gt_matched = _within(pred_tree, gt_points, tolerance, workers)
+    precision = pred_weights[pred_matched].sum() / pred_weights.sum() if len(pred_points) else 0
+    recall = gt_weights[gt_matched].sum() / gt_weights.sum() if len(gt_points) else 0
+    f1_score = (2 * precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+
+    # 2. BIoU (경계 buffer 영역을 격자점으로 셈)
+    biou_ratio = 0
+    if len(gt_points) or len(pred_points):
+        lattice = band_lattice(np.concatenate([gt_points, pred_points]), boundary_buffer, cell)
+        in_gt = _within(gt_tree, lattice, boundary_buffer, workers)
+        in_pred = _within(pred_tree, lattice, boundary_buffer, workers)
+        boundary_union = np.count_nonzero(in_gt | in_pred)
+        biou_ratio = np.count_nonzero(in_gt & in_pred) / boundary_union if boundary_union > 0 else 0
+
+    return {
+        "biou_ratio": float(biou_ratio),
+        "boundary_precision": float(precision),
+        "boundary_recall": float(recall),
+        "boundary_f1": float(f1_score)
+    }
@@ -0,0 +1,108 @@
+"""
+1_verification 지표를 한 번의 교차 계산으로 모두 구하는 엔진
+- GT×Pred 겹침 쌍은 STRtree 한 번으로 탐색 (기존 이중 for문 + intersects와 같은 쌍, 같은 순서)
+- 교차 폴리곤, 합집합은 shapely 2 배열 연산으로 한 번만 계산해 모든 지표가 공유
+- 면적 합은 기존과 같은 순서의 파이썬 sum을 사용하여 결과가 기존 함수와 비트 단위로 같음
+backend="raster"이면 raster_metrics의 격자 근사로 계산 (대규모 반복 실험용)
+backend="kdtree"이면 면적 지표는 vector와 같고 BIoU만 boundary_metrics(경계 표본점 + cKDTree)로 계산, boundary precision/recall/F-score 추가
+근사 backend가 빠른 범위 (bench_raster_metrics, bench_boundary_metrics, bench_suite의 indicators_* 단계):
+- 마스크 윤곽선 폴리곤(samPoly처럼 계단 모양 꼭짓점이 많음)에서만 이득, 꼭짓점이 적은 폴리곤끼리는 모든 해상도에서 vector가 빠름
+- raster는 0.1 m부터 빠름 (0.2 m에서 약 10배, 최대 BIoU 오차 약 0.02)
+- kdtree는 0.2 m부터 빠름 (0.4 m에서 약 6배, 최대 BIoU 오차 약 0.01), 0.1 m에서는 vector보다 느림
+  경계가 긴 큰 타일에서는 0.4 m에서도 vector와 비슷하므로 속도보다 boundary F-score가 필요할 때 사용
+"""
+
+import numpy as np
+import shapely
+from dataclasses import dataclass
+from raster_metrics import compute_indicators_raster
+from boundary_metrics import compute_boundary_metrics
+
+BACKENDS = ("vector", "raster", "kdtree")
+DEFAULT_RESOLUTION = {"raster": 0.2, "kdtree": 0.4}  # [m], resolution=None일 때 사용 (vector보다 빠른 범위)
+
+BOUNDARY_QUAD_SEGS = 16  # poly.boundary.buffer() 기본값 (shapely.buffer 함수의 기본값 8과 다름)
+
+@dataclass
+class SharedOverlay:
+    gt_geoms: np.ndarray
+    pred_geoms: np.ndarray
+    gt_index: np.ndarray        # 겹치는 쌍의 GT 위치
+    pred_index: np.ndarray      # 겹치는 쌍의 Pred 위치
+    intersections: np.ndarray   # 쌍별 교차 폴리곤
+    gt_union: object
+    pred_union: object
+
+    @property
+    def intersection_area_sum(self):
+        # 기존 sum(poly.area for poly in intersection_polygons)와 같은 순서로 더함
+        return sum(shapely.area(self.intersections).tolist())
+
+# 겹치는 쌍과 교차 폴리곤, GT/Pred 합집합을 한 번에 계산
+def compute_overlay(gt_gdf, pred_gdf):
+    gt_geoms = np.asarray(gt_gdf.geometry.values)
+    pred_geoms = np.asarray(pred_gdf.geometry.values)
+
+    # GT 순서, 그 안에서 Pred 순서 (기존 이중 for문 순서)
+    gt_index, pred_index = shapely.STRtree(pred_geoms).query(gt_geoms, predicate="intersects")
+    order = np.lexsort((pred_index, gt_index))
+    gt_index, pred_index = gt_index[order], pred_index[order]
+
+    intersections = shapely.intersection(gt_geoms[gt_index], pred_geoms[pred_index])
+    return SharedOverlay(gt_geoms, pred_geoms, gt_index, pred_index, intersections,
+                         shapely.union_all(gt_geoms), shapely.union_all(pred_geoms))
+
+def overlap_ratios(overlay, total_gt_area, total_pred_area):
+    total_overlap_area = shapely.union_all(overlay.intersections).area
+    overlap_ratio_gt = total_overlap_area / total_gt_area if total_gt_area > 0 else 0
+    overlap_ratio_pred = total_overlap_area / total_pred_area if total_pred_area > 0 else 0
+    return overlap_ratio_gt, overlap_ratio_pred
+
+def iou_ratio(overlay):
+    total_union_area = overlay.gt_union.union(overlay.pred_union).area
+    return overlay.intersection_area_sum / total_union_area if total_union_area > 0 else 0
+
+def biou_ratio(overlay, boundary_buffer=2.0):
+    gt_boundary = shapely.union_all(shapely.buffer(shapely.boundary(overlay.gt_geoms), boundary_buffer, quad_segs=BOUNDARY_QUAD_SEGS))
+    pred_boundary = shapely.union_all(shapely.buffer(shapely.boundary(overlay.pred_geoms), boundary_buffer, quad_segs=BOUNDARY_QUAD_SEGS))
+    boundary_intersection = gt_boundary.intersection(pred_boundary).area
+    boundary_union = gt_boundary.union(pred_boundary).area
+    return boundary_intersection / boundary_union if boundary_union > 0 else 0
+
+def precision_recall_f1(overlay):
+    TP = overlay.intersection_area_sum
+    FP = overlay.pred_union.difference(overlay.gt_union).area  # Predicted 영역에서 GT와 겹치지 않는 부분
+    FN = overlay.gt_union.difference(overlay.pred_union).area  # GT 영역에서 Predicted와 겹치지 않는 부분
+
+    precision = TP / (TP + FP) if (TP + FP) > 0 else 0
+    recall = TP / (TP + FN) if (TP + FN) > 0 else 0
+    f1_score = (2 * precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+    return precision, recall, f1_score
+
+# 1_verification.calculate_indicators의 모든 지표 (index 제외)
+# backend: "vector"(정확, 기존과 동일) / "raster"(resolution [m] 격자 근사) / "kdtree"(BIoU만 resolution [m] 표본 간격으로 근사)
+def compute_indicators(gt_gdf, pred_gdf, boundary_buffer=2.0, backend="vector", resolution=None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown metrics backend: {backend} (choose from {BACKENDS})")
+    if resolution is None:
+        resolution = DEFAULT_RESOLUTION.get(backend)
+    if backend == "raster":
+        return compute_indicators_raster(gt_gdf, pred_gdf, boundary_buffer, resolution)
+
+    overlay = compute_overlay(gt_gdf, pred_gdf)
+    overlap_ratio_gt, overlap_ratio_pred = overlap_ratios(overlay, gt_gdf.area.sum(), pred_gdf.area.sum())
+    precision, recall, f1_score = precision_recall_f1(overlay)
+    indicators = {
+        "overlap_ratio_gt": overlap_ratio_gt,
+        "overlap_ratio_pred": overlap_ratio_pred,
+        "iou_ratio": iou_ratio(overlay),
+        "biou_ratio": None,
+        "precision": precision,
+        "recall": recall,
+        "f1_score": f1_score
+    }
+    if backend == "kdtree":
+        indicators.update(compute_boundary_metrics(gt_gdf, pred_gdf, boundary_buffer, spacing=resolution, cell=resolution))
+    else:
+        indicators["biou_ratio"] = biou_ratio(overlay, boundary_buffer)
+    return indicators
@@ -0,0 +1,91 @@
+"""
+1_verification 지표의 래스터 근사 계산 (대규모 반복 실험용 빠른 모드)
+GT / Pred 폴리곤을 같은 격자(해상도 resolution [m])에 래스터화한 뒤 NumPy boolean 연산으로 모든 지표 계산
+- 픽셀 중심이 폴리곤 안이면 포함, 중첩된 폴리곤은 덮은 횟수(count)로 기록 → 교차 면적 합(TP)도 계산 가능
+- BIoU의 경계 버퍼는 경계선 래스터에서의 거리 변환(cv2, 정확한 유클리드 거리)으로 계산
+오차: 폴리곤 하나의 면적 오차는 둘레 × resolution × √2 / 2 이하 (area_error_bound), 해상도에 비례해 줄어듦
+"""
+
+import numpy as np
+import shapely
+from affine import Affine
+from rasterio.features import rasterize
+from rasterio.enums import MergeAlg
+import cv2
+
+INDICATORS = ("overlap_ratio_gt", "overlap_ratio_pred", "iou_ratio", "biou_ratio", "precision", "recall", "f1_score")
+
+# GT와 Pred를 모두 덮는 공통 격자 (경계 버퍼만큼 여유)
+def shared_grid(gt_geoms, pred_geoms, resolution, margin):
+    geoms = np.concatenate([gt_geoms, pred_geoms])
+    minx, miny, maxx, maxy = shapely.total_bounds(geoms)
+    minx, miny, maxx, maxy = minx - margin, miny - margin, maxx + margin, maxy + margin
+    width = max(1, int(np.ceil((maxx - minx) / resolution)))
+    height = max(1, int(np.ceil((maxy - miny) / resolution)))
+    transform = Affine(resolution, 0, minx, 0, -resolution, maxy)
+    return transform, (height, width)
+
+# 폴리곤을 덮은 횟수 래스터 (겹친 폴리곤은 2, 3, ...)
+def coverage_count(geoms, transform, shape):
+    geoms = [geom for geom in geoms if geom is not None and not geom.is_empty]
+    if not geoms:
+        return np.zeros(shape, dtype=np.uint16)
+    return rasterize(((geom, 1) for geom in geoms), out_shape=shape, transform=transform, fill=0,
+                     merge_alg=MergeAlg.add, dtype=np.uint16)
+
+# 각 폴리곤 경계에서 boundary_buffer 이내의 픽셀 (polygon.boundary.buffer의 합집합에 해당)
+def boundary_band(geoms, transform, shape, resolution, boundary_buffer):
+    lines = [shapely.boundary(geom) for geom in geoms if geom is not None and not geom.is_empty]
+    if not lines:
+        return np.zeros(shape, dtype=bool)
+    boundary = rasterize(((line, 1) for line in lines), out_shape=shape, transform=transform, fill=0,
+                         all_touched=True, dtype=np.uint8)
+    distance = cv2.distanceTransform((boundary == 0).astype(np.uint8), cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+    return distance * resolution <= boundary_buffer
+
+# 폴리곤별 래스터 면적 오차 상한의 합
+def area_error_bound(geoms, resolution):
+    return float(np.nansum(shapely.length(np.asarray(geoms)))) * resolution * np.sqrt(2) / 2
+
+def compute_indicators_raster(gt_gdf, pred_gdf, boundary_buffer=2.0, resolution=0.1):
+    gt_geoms = np.asarray(gt_gdf.geometry.values)
+    pred_geoms = np.asarray(pred_gdf.geometry.values)
+    if not np.isfinite(shapely.total_bounds(np.concatenate([gt_geoms, pred_geoms]))).all():
+        return dict.fromkeys(INDICATORS, 0)  # GT, Pred 모두 비어 있음
+    transform, shape = shared_grid(gt_geoms, pred_geoms, resolution, boundary_buffer + 2 * resolution)
+    cell_area = resolution * resolution
+
+    gt_count = coverage_count(gt_geoms, transform, shape)
+    pred_count = coverage_count(pred_geoms, transform, shape)
+    gt_mask, pred_mask = gt_count > 0, pred_count > 0
+
+    total_gt_area = gt_count.sum(dtype=np.int64) * cell_area
+    total_pred_area = pred_count.sum(dtype=np.int64) * cell_area
+    overlap_area = np.count_nonzero(gt_mask & pred_mask) * cell_area               # 교차 폴리곤 합집합 면적
+    TP = np.sum(gt_count.astype(np.int64) * pred_count, dtype=np.int64) * cell_area  # 쌍별 교차 면적의 합
+    union_area = np.count_nonzero(gt_mask | pred_mask) * cell_area
+    FP = np.count_nonzero(pred_mask & ~gt_mask) * cell_area
+    FN = np.count_nonzero(gt_mask & ~pred_mask) * cell_area
+
+    overlap_ratio_gt = overlap_area / total_gt_area if total_gt_area > 0 else 0
+    overlap_ratio_pred = overlap_area / total_pred_area if total_pred_area > 0 else 0
+    iou_ratio = TP / union_area if union_area > 0 else 0
+
+    gt_band = boundary_band(gt_geoms, transform, shape, resolution, boundary_buffer)
+    pred_band = boundary_band(pred_geoms, transform, shape, resolution, boundary_buffer)
+    boundary_union = np.count_nonzero(gt_band | pred_band)
+    biou_ratio = np.count_nonzero(gt_band & pred_band) / boundary_union if boundary_union > 0 else 0
+
+    precision = TP / (TP + FP) if (TP + FP) > 0 else 0
+    recall = TP / (TP + FN) if (TP + FN) > 0 else 0
+    f1_score = (2 * precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+
+    return {
+        "overlap_ratio_gt": float(overlap_ratio_gt),
+        "overlap_ratio_pred": float(overlap_ratio_pred),
+        "iou_ratio": float(iou_ratio),
+        "biou_ratio": float(biou_ratio),
+        "precision": float(precision),
+        "recall": float(recall),
+        "f1_score": float(f1_score)
+    }
@@ -3,6 +3,9 @@ import os
 import glob
 import pandas as pd
 import numpy as np
+import shapely
+from dataclasses import dataclass
+from scipy.sparse import csr_matrix
 from shapely.geometry import Polygon, Point
 from shapely.ops import unary_union
 from scipy.spatial import cKDTree
@@ -13,20 +16,53 @@ def load_shapefiles(ground_truth_path, predicted_path):
     pred_gdf = gpd.read_file(predicted_path)  # 추론한 폴리곤
     return gt_gdf, pred_gdf
 
-# 2. 폴리곤 매칭 (IoU 기준으로 대응되는 폴리곤을 찾기)
+@dataclass
+class PairMatrix:
+    """
+    GT × Pred 쌍별 지표 (교차 면적이 0보다 큰 쌍만, GT 순서 → 그 안에서 Pred 순서)
+    sparse(name)으로 (GT 수 × Pred 수) 희소 행렬을 만들 수 있음
+    """
+    shape: tuple
+    gt_index: np.ndarray     # 쌍의 GT 위치
+    pred_index: np.ndarray   # 쌍의 Pred 위치
+    intersection_area: np.ndarray
+    iou: np.ndarray
+    precision: np.ndarray
+    recall: np.ndarray
+    f1_score: np.ndarray
+
+    def sparse(self, name):
+        return csr_matrix((getattr(self, name), (self.gt_index, self.pred_index)), shape=self.shape)
+
+# 2. 겹치는 쌍을 공간 인덱스로 한 번에 찾고, 교차 면적은 쌍마다 한 번만 계산해 모든 지표에 사용
+def build_pair_matrix(gt_gdf, pred_gdf):
+    gt_geoms = np.asarray(gt_gdf.geometry.values)
+    pred_geoms = np.asarray(pred_gdf.geometry.values)
+
+    gt_index, pred_index = shapely.STRtree(pred_geoms).query(gt_geoms, predicate="intersects")
+    order = np.lexsort((pred_index, gt_index))  # 기존 이중 iterrows 순서
+    gt_index, pred_index = gt_index[order], pred_index[order]
+
+    TP = shapely.area(shapely.intersection(gt_geoms[gt_index], pred_geoms[pred_index]))
+    overlapping = TP > 0  # IOU가 0보다 큰 경우만 대응 (경계만 맞닿은 쌍 제외)
+    gt_index, pred_index, TP = gt_index[overlapping], pred_index[overlapping], TP[overlapping]
+
+    gt_area = shapely.area(gt_geoms)[gt_index]
+    pred_area = shapely.area(pred_geoms)[pred_index]
+    FP = pred_area - TP
+    FN = gt_area - TP
+    precision = TP / (TP + FP)
+    recall = TP / (TP + FN)
+    f1_score = (2 * precision * recall) / (precision + recall)
+    iou = TP / (gt_area + pred_area - TP)
+    return PairMatrix((len(gt_geoms), len(pred_geoms)), gt_index, pred_index, TP, iou, precision, recall, f1_score)
+
+# 폴리곤 매칭 (IoU 기준으로 대응되는 폴리곤을 찾기), (GT 행, Pred 행, IoU) 목록
 def match_polygons_by_iou(gt_gdf, pred_gdf):
-    matched_pairs = []
-    
-    for idx_gt, gt_poly in gt_gdf.iterrows():
-        for idx_pred, pred_poly in pred_gdf.iterrows():
-            intersection = gt_poly.geometry.intersection(pred_poly.geometry)
-            iou = intersection.area / (gt_poly.geometry.area + pred_poly.geometry.area - intersection.area)
-            if iou > 0:  # IOU가 0보다 큰 경우만 대응
-                matched_pairs.append((gt_poly, pred_poly, iou))
-    
-    return matched_pairs
+    pairs = build_pair_matrix(gt_gdf, pred_gdf)
+    return [(gt_gdf.iloc[i], pred_gdf.iloc[j], iou) for i, j, iou in zip(pairs.gt_index, pairs.pred_index, pairs.iou.tolist())]
 
-# 3. Precision, Recall, F1, IoU 지표 계산
+# 3. Precision, Recall, F1, IoU 지표 계산 (쌍 하나)
 def calculate_metrics_for_pair(gt_poly, pred_poly):
     intersection = gt_poly.geometry.intersection(pred_poly.geometry)
     TP = intersection.area
@@ -40,23 +76,35 @@ def calculate_metrics_for_pair(gt_poly, pred_poly):
     
     return precision, recall, f1_score, iou
 
-# 4. 각 폴리곤에 대해 계산한 결과 저장
+# 4. 각 폴리곤 쌍의 결과 (build_pair_matrix의 쌍별 지표를 그대로 표로 변환)
 def calculate_indicators_for_all_pairs(gt_gdf, pred_gdf):
-    matched_pairs = match_polygons_by_iou(gt_gdf, pred_gdf)
-    
+    pairs = build_pair_matrix(gt_gdf, pred_gdf)
+    return pd.DataFrame({
+        "gt_index": gt_gdf.index[pairs.gt_index],
+        "pred_index": pred_gdf.index[pairs.pred_index],
+        "iou_ratio": pairs.iou,
+        "precision": pairs.precision,
+        "recall": pairs.recall,
+        "f1_score": pairs.f1_score
+    }).to_dict("records")
+
+# 기존 방식 (이중 iterrows로 모든 쌍의 교차를 두 번씩 계산, 비교/검증용)
+def calculate_indicators_for_all_pairs_bruteforce(gt_gdf, pred_gdf):
     results = []
-    for gt_poly, pred_poly, iou in matched_pairs:
-        precision, recall, f1_score, iou = calculate_metrics_for_pair(gt_poly, pred_poly)
-        
-        results.append({
-            "gt_index": gt_poly.name,
-            "pred_index": pred_poly.name,
-            "iou_ratio": iou,
-            "precision": precision,
-            "recall": recall,
-            "f1_score": f1_score
-        })
-    
+    for idx_gt, gt_poly in gt_gdf.iterrows():
+        for idx_pred, pred_poly in pred_gdf.iterrows():
+            intersection = gt_poly.geometry.intersection(pred_poly.geometry)
+            iou = intersection.area / (gt_poly.geometry.area + pred_poly.geometry.area - intersection.area)
+            if iou > 0:  # IOU가 0보다 큰 경우만 대응
+                precision, recall, f1_score, iou = calculate_metrics_for_pair(gt_poly, pred_poly)
+                results.append({
+                    "gt_index": gt_poly.name,
+                    "pred_index": pred_poly.name,
+                    "iou_ratio": iou,
+                    "precision": precision,
+                    "recall": recall,
+                    "f1_score": f1_score
+                })
     return results
 
 # 5. 결과를 DataFrame으로 변환하여 출력
@@ -0,0 +1,215 @@
+"""
+모든 타일의 검증 지표를 프로세스 풀로 나누어 계산하고, 끝나는 대로 열 기반 파일(Parquet, 또는 CSV)에 이어서 기록
+- 타일은 파일명 번호(tile_id)로 식별
+- underSeg(기존 추론)와 sam(정제 결과) 지표는 tile_id로 짝지음 (행 순서에 의존하지 않으므로 파일이 빠져도 안전)
+- sam 결과는 samPoly*.shp 폴더 또는 process_main의 PolygonStore 파일(.gpkg / .parquet)에서 읽음
+"""
+
+import os
+import re
+import sys
+import glob
+import pandas as pd
+import geopandas as gpd
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from metrics_engine import compute_indicators
+from boundary_metrics import BOUNDARY_INDICATORS
+
+# applyModel의 PolygonStore 읽기 함수 사용
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BASE_DIR, "..", "applyModel"))
+from polygon_store import read_polygon_store, read_store_tile_ids
+
+INDICATORS = ["overlap_ratio_gt", "overlap_ratio_pred", "iou_ratio", "biou_ratio", "precision", "recall", "f1_score"]
+KEY_COLUMNS = ["tile_id", "kind", "index"]
+
+# backend별 지표 열 (kdtree는 boundary precision / recall / F-score 추가)
+def indicator_columns(backend="vector"):
+    if backend == "kdtree":
+        return INDICATORS + [name for name in BOUNDARY_INDICATORS if name not in INDICATORS]
+    return list(INDICATORS)
+
+def is_store(sam_source):
+    return os.path.splitext(sam_source)[1].lower() in (".gpkg", ".parquet")
+
+# 검증할 타일 목록: (tile_id, GT 경로, underSeg 경로), tile_id는 sam 결과 파일명/저장소의 번호
+def collect_tiles(each_infer_folder, each_digital_folder, sam_source):
+    if is_store(sam_source):
+        tile_ids = sorted(read_store_tile_ids(sam_source), key=_numeric_key)
+    else:
+        mask_shapefiles = glob.glob(os.path.join(sam_source, "samPoly*.shp"))
+        tile_ids = sorted({re.search(r'\d+', os.path.basename(path)).group() for path in mask_shapefiles}, key=_numeric_key)
+    return [(tile_id,
+             os.path.join(each_digital_folder, f"digitalPoly{tile_id}.shp"),
+             os.path.join(each_infer_folder, f"underSegPoly{tile_id}.shp")) for tile_id in tile_ids]
+
+def _numeric_key(tile_id):
+    return (0, int(tile_id)) if str(tile_id).isdigit() else (1, str(tile_id))
+
+def _row(tile_id, kind, index_name, indicators, backend):
+    row = {"tile_id": str(tile_id), "kind": kind, "index": index_name}
+    row.update({name: float(indicators[name]) for name in indicator_columns(backend)})
+    return row
+
+# 저장소는 부모 프로세스에서 한 번만 읽어 tile_id별로 나눔 (타일마다 저장소 전체를 읽지 않도록), 폴더면 None
+def split_sam_store(sam_source):
+    if not is_store(sam_source):
+        return None
+    store = read_polygon_store(sam_source)
+    return {str(tile_id): gdf.reset_index(drop=True) for tile_id, gdf in store.groupby("tile_id", sort=False)}
+
+# sam 결과 폴리곤 읽기 (없으면 None)
+def load_sam_polygons(sam_source, tile_id):
+    if is_store(sam_source):
+        gdf = read_polygon_store(sam_source, tile_id)
+        return gdf if len(gdf) else None
+    mask_path = os.path.join(sam_source, f"samPoly{tile_id}.shp")
+    return gpd.read_file(mask_path) if os.path.exists(mask_path) else None
+
+# 타일 하나의 지표 계산 (프로세스 풀 작업 단위)
+# sam_polygons: split_sam_store로 미리 나눈 이 타일의 sam 폴리곤 (None이면 sam_source에서 읽음)
+def verify_tile(tile_id, gt_path, underseg_path, sam_source, boundary_buffer=2.0, backend="vector", resolution=None, sam_polygons=None):
+    if not os.path.exists(gt_path):
+        print(f"[경고] digitalPoly{tile_id}.shp 파일을 찾을 수 없습니다. ({gt_path})")
+        return []
+    gt_gdf = gpd.read_file(gt_path)
+    rows = []
+
+    # 1️⃣ GT vs 추론 폴리곤 비교
+    if os.path.exists(underseg_path):
+        each_pred_gdf = gpd.read_file(underseg_path)
+        indicators = compute_indicators(gt_gdf, each_pred_gdf, boundary_buffer, backend, resolution)
+        rows.append(_row(tile_id, "underseg", f"underSegPoly{tile_id}", indicators, backend))
+    else:
+        print(f"[경고] underSegPoly{tile_id}.shp 파일을 찾을 수 없습니다. ({underseg_path})")
+
+    # 2️⃣ GT vs 마스크 폴리곤 비교 (하나로 합쳐진 마스크 폴리곤)
+    if sam_polygons is None:
+        mask_pred_gdf = load_sam_polygons(sam_source, tile_id)
+    else:
+        mask_pred_gdf = sam_polygons if len(sam_polygons) else None
+    if mask_pred_gdf is not None:
+        unified_mask_gdf = gpd.GeoDataFrame(geometry=[mask_pred_gdf.unary_union], crs=mask_pred_gdf.crs)
+        indicators = compute_indicators(gt_gdf, unified_mask_gdf, boundary_buffer, backend, resolution)
+        rows.append(_row(tile_id, "sam", f"samPoly{tile_id}", indicators, backend))
+    else:
+        print(f"[경고] samPoly{tile_id} 결과를 찾을 수 없습니다. ({sam_source})")
+    return rows
+
+class MetricsWriter:
+    """
+    지표 행을 flush_rows개씩 모아 파일에 이어서 기록 (.parquet은 row group 단위, .csv는 행 추가)
+    indicators: 지표 열 (indicator_columns(backend))
+    """
+    def __init__(self, path, flush_rows=256, indicators=INDICATORS):
+        self.path, self.flush_rows = path, flush_rows
+        self.indicators = list(indicators)
+        self.columns = KEY_COLUMNS + self.indicators
+        self.format = "parquet" if path.lower().endswith(".parquet") else "csv"
+        self._rows = []
+        self._writer = None
+        self.rows = 0
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, rows):
+        self._rows.extend(rows)
+        self.rows += len(rows)
+        if len(self._rows) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        df = pd.DataFrame(self._rows, columns=self.columns)
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.schema([(name, pa.string()) for name in KEY_COLUMNS] + [(name, pa.float64()) for name in self.indicators])
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, schema)
+            self._writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+        else:
+            df.to_csv(self.path, mode="a", header=not os.path.exists(self.path), index=False)
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_metrics(path):
+    if path.lower().endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={"tile_id": str, "kind": str, "index": str}, float_precision="round_trip")
+    # 타일 번호 순, 같은 타일은 underseg → sam 순
+    order = sorted(range(len(df)), key=lambda i: (_numeric_key(df["tile_id"].iat[i]), df["kind"].iat[i] != "underseg"))
+    return df.iloc[order].reset_index(drop=True)
+
+def run_verification(tiles, sam_source, output_path, workers=None, boundary_buffer=2.0, backend="vector", resolution=None, max_in_flight=None):
+    """
+    tiles: collect_tiles 결과, 지표는 타일이 끝나는 순서대로 output_path에 기록
+    workers: 프로세스 수 (None이면 CPU 코어 수, 0이면 현재 프로세스에서 순차 실행)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    options = (sam_source, boundary_buffer, backend, resolution)
+    sam_slices = split_sam_store(sam_source)
+
+    with MetricsWriter(output_path, indicators=indicator_columns(backend)) as writer:
+        if workers == 0:
+            for tile in tiles:
+                writer.write(verify_tile(*tile, *options, sam_polygons=_sam_slice(sam_slices, tile[0])))
+        else:
+            _run_pool(tiles, options, sam_slices, writer, workers, max_in_flight or 4 * workers)
+    print(f"✅ {writer.rows}개의 지표 행을 {output_path}에 저장했습니다.")
+    return output_path
+
+# 실행 중인 작업이 max_in_flight개가 되도록 채우며 끝난 타일부터 기록 (타일 목록 전체를 한 번에 제출하지 않음)
+# 저장소에 기록이 없는 타일은 빈 GeoDataFrame (sam 결과 없음)
+def _sam_slice(sam_slices, tile_id):
+    if sam_slices is None:
+        return None
+    return sam_slices.get(str(tile_id), gpd.GeoDataFrame(geometry=[]))
+
+def _run_pool(tiles, options, sam_slices, writer, workers, max_in_flight):
+    tiles = iter(tiles)
+    with ProcessPoolExecutor(workers) as pool:
+        pending = set()
+        while True:
+            for tile in tiles:
+                pending.add(pool.submit(verify_tile, *tile, *options, sam_polygons=_sam_slice(sam_slices, tile[0])))
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                writer.write(future.result())
+
+# underseg / sam 지표를 tile_id로 짝지어 증감 계산 (한쪽만 있는 타일은 제외)
+def pair_by_tile(df_results):
+    underseg = df_results[df_results["kind"] == "underseg"].set_index("tile_id")
+    sam = df_results[df_results["kind"] == "sam"].set_index("tile_id")
+    tile_ids = [tile_id for tile_id in underseg.index if tile_id in sam.index]
+    missing = (set(underseg.index) ^ set(sam.index))
+    if missing:
+        print(f"[경고] underseg/sam 중 하나만 있는 타일 {len(missing)}개는 비교에서 제외합니다: {sorted(missing, key=_numeric_key)[:10]}")
+
+    underseg, sam = underseg.loc[tile_ids], sam.loc[tile_ids]
+    return pd.DataFrame({
+        "index": [f"Poly{tile_id}" for tile_id in tile_ids],
+        "iou_ratio_change": (sam["iou_ratio"] - underseg["iou_ratio"]).values,
+        "precision_change": (sam["precision"] - underseg["precision"]).values,
+        "recall_change": (sam["recall"] - underseg["recall"]).values,
+        "f1_score_change": (sam["f1_score"] - underseg["f1_score"]).values,
+    })